@@ -1,20 +1,318 @@
 import aiohttp
 import asyncio
+import bisect
+import copy
+import io
 import re
 import socket
 import ssl
 import json
 import logging
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from lxml import etree
 from urllib.parse import urljoin, urlparse
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import dns.resolver
+import dns.asyncresolver
 import hashlib
+import itertools
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+# Prefer the lexbor-backed selectolax parser; fall back to BeautifulSoup + lxml
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    LexborHTMLParser = None
+    SELECTOLAX_AVAILABLE = False
+
+# Linear-time RE2 automaton for the page-wide pattern scans; stdlib re otherwise
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+
+# Aho-Corasick automaton for the fixed keyword scan; plain substring checks otherwise
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+def compile_scan_pattern(pattern: bytes):
+    """Compile a scan pattern with RE2 when possible (flags must be inline, e.g. (?m))"""
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except Exception as e:
+            logger.warning(f"⚠️ RE2 rejected pattern, using stdlib re: {e}")
+    return re.compile(pattern)
+
+@dataclass(frozen=True, slots=True)
+class ScanPattern:
+    """One entry of a page pattern table (lowercase regex source, matched as bytes)"""
+    name: str
+    pattern: str
+    weight: int
+    description: str
+
+# Malware signatures; weight is the severity (1-10)
+MALWARE_PATTERNS: Tuple[ScanPattern, ...] = (
+    ScanPattern("base64_payload", r"eval\s*\(\s*base64_decode|atob\s*\(", 9, "Base64 encoded payload execution"),
+    ScanPattern("obfuscated_javascript", r"string\.fromcharcode\s*\(|\\x[0-9a-f]{2}", 8, "Obfuscated JavaScript code"),
+    ScanPattern("malicious_iframe", r"<iframe[^>]*(?:style\s*=\s*[\"'].*display\s*:\s*none|width\s*=\s*[\"']?0|height\s*=\s*[\"']?0)", 8, "Hidden malicious iframe"),
+    ScanPattern("crypto_mining", r"(coinhive|cryptoloot|coin-hive|minergate|cryptonight)", 7, "Cryptocurrency mining code"),
+    ScanPattern("shell_injection", r"(system|exec|shell_exec|passthru|popen)\s*\(", 10, "System command execution"),
+    ScanPattern("sql_injection", r"(union\s+select|drop\s+table|delete\s+from|insert\s+into).*[\"'][^\"']*[\"']", 9, "SQL injection patterns"),
+    ScanPattern("xss_vectors", r"<script[^>]*>.*?(alert|prompt|confirm|document\.cookie)\s*\(", 7, "Cross-site scripting vectors"),
+    ScanPattern("malicious_redirects", r"window\.location\s*=\s*[\"'][^\"']*(?:bit\.ly|tinyurl|t\.co)", 6, "Suspicious redirect patterns")
+)
+
+MALWARE_SEVERITY = {p.name: p.weight for p in MALWARE_PATTERNS}
+CRITICAL_SEVERITY = 10
+# malware_score is min(100, hits * 8), so 13 hits already saturate it
+MALWARE_SATURATION_HITS = 13
+
+# Phishing content indicators; weight is added to the phishing score
+PHISHING_INDICATORS: Tuple[ScanPattern, ...] = (
+    ScanPattern("urgent_action", r"(urgent|immediate|expires?|suspend|verify|confirm|act\s+now).*(?:account|payment|security)", 20, "Urgency-based social engineering"),
+    ScanPattern("fake_authentication", r"(?:login|sign\s*in|log\s*in).*(?:paypal|amazon|microsoft|google|apple|facebook|twitter)", 25, "Fake authentication pages"),
+    ScanPattern("prize_lottery_scam", r"(congratulations|winner|prize|lottery|selected|won).*(?:\$|money|cash|reward)", 18, "Prize/lottery scam indicators"),
+    ScanPattern("payment_fraud", r"(payment|billing|invoice|overdue|refund|transaction).*(?:failed|pending|suspended)", 22, "Payment fraud indicators"),
+    ScanPattern("security_scare", r"(security\s+alert|account\s+(?:locked|compromised)|suspicious\s+activity|unauthorized\s+access)", 20, "Fake security alerts"),
+    ScanPattern("download_trojan", r"(?:download|install|update).*(?:urgent|required|security|antivirus|player|codec)", 15, "Malicious download bait")
+)
+
+# Social engineering tactics; weight is added to the social engineering score
+SOCIAL_ENGINEERING_PATTERNS: Tuple[ScanPattern, ...] = (
+    ScanPattern("authority_impersonation", r"(government|official|authority|police|fbi|irs|tax|legal).*(?:notice|warning|action)", 25, "Authority figure impersonation"),
+    ScanPattern("fear_uncertainty_doubt", r"(warning|danger|risk|threat|compromise|breach|hack).*(?:immediate|urgent|now)", 20, "Fear, uncertainty, and doubt tactics"),
+    ScanPattern("artificial_scarcity", r"(limited\s+time|expires?|only\s+\d+|last\s+chance|while\s+supplies)", 15, "Artificial scarcity pressure"),
+    ScanPattern("trust_exploitation", r"(trusted|verified|certified|official|authorized).*(?:by|partner|member)", 12, "False trust indicators"),
+    ScanPattern("emotional_manipulation", r"(help|save|donate|charity|victim|emergency|disaster)", 10, "Emotional manipulation tactics")
+)
+
+def compile_page_patterns(malware_patterns: Tuple[ScanPattern, ...], social_engineering_patterns: Tuple[ScanPattern, ...]):
+    """Compile the page-wide pattern tables: (unioned malware regex, separate malware regexes, social engineering regexes)"""
+    # Malware patterns without ".*" are unioned into a single regex with one
+    # named group per pattern, so one pass over the page finds all their hits.
+    # A ".*" pattern would swallow the rest of the line inside the union and
+    # hide other patterns' matches (common on one-line minified HTML), so those
+    # stay separate regexes. RE2 guarantees linear-time matching on hostile
+    # pages (no backtracking). Patterns are lowercase and run against the
+    # pre-lowercased page, so no case folding. Everything is compiled as bytes
+    # patterns to match the raw body directly.
+    unioned = [p for p in malware_patterns if ".*" not in p.pattern]
+    malware_re = compile_scan_pattern(
+        ("(?m)" + "|".join(f"(?P<{p.name}>{p.pattern})" for p in unioned)).encode()
+    )
+    malware_res = {
+        p.name: compile_scan_pattern(p.pattern.encode())
+        for p in malware_patterns if ".*" in p.pattern
+    }
+    social_engineering_res = {
+        p.name: compile_scan_pattern(p.pattern.encode())
+        for p in social_engineering_patterns
+    }
+    return malware_re, malware_res, social_engineering_res
+
+def scan_page_patterns(kind: str, html: bytes, malware_re, malware_res, social_engineering_res):
+    """CPU-bound pattern pass over the lowercased page body"""
+    if kind == "malware":
+        # Detect-or-classify rather than exhaustive enumeration: stop once the
+        # malware score is saturated or a critical-severity pattern has matched
+        counts = Counter()
+        hits = itertools.chain(
+            (match.lastgroup for match in malware_re.finditer(html)),
+            (name for name, pattern in malware_res.items() for _ in pattern.finditer(html))
+        )
+        for name in hits:
+            counts[name] += 1
+            if counts.total() >= MALWARE_SATURATION_HITS or MALWARE_SEVERITY[name] >= CRITICAL_SEVERITY:
+                break
+        return dict(counts)
+    return [name for name, pattern in social_engineering_res.items() if pattern.search(html)]
+
+# Patterns compiled once per process-pool worker by _init_scan_worker
+_worker_patterns = None
+
+def _init_scan_worker():
+    global _worker_patterns
+    _worker_patterns = compile_page_patterns(MALWARE_PATTERNS, SOCIAL_ENGINEERING_PATTERNS)
+
+def _scan_worker(kind: str, html: bytes):
+    return scan_page_patterns(kind, html, *_worker_patterns)
+
+# Cache lifetimes (seconds) for per-domain network lookups
+DNS_RECORD_TYPES = ('A', 'AAAA', 'MX', 'TXT', 'NS', 'CNAME', 'SOA')
+DNS_CACHE_TTLS = {'A': 300, 'AAAA': 300, 'CNAME': 300, 'MX': 3600, 'TXT': 3600, 'NS': 3600, 'SOA': 3600}
+SSL_CACHE_TTL = 86400
+MAX_DOMAIN_CACHE_SIZE = 2000
+
+# Short-lived cache of whole comprehensive_scan results per URL
+SCAN_CACHE_TTL = 60
+MAX_SCAN_CACHE_SIZE = 1024
+
+# Upper bound on the downloaded page body; bounds regex/parse work per scan
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Pattern scan worker processes: at most the CPUs this process may run on,
+# capped low because each worker is a full interpreter (free-tier hosts have
+# little RAM, and cgroup CPU quotas are not visible to the affinity mask)
+MAX_SCAN_WORKERS = 2
+SCAN_WORKERS = min(
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1),
+    MAX_SCAN_WORKERS
+)
+# Workers are started after Motor/aiohttp threads exist, so never plain fork
+SCAN_WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Result keys for the comprehensive scan, in the order the scans are gathered
+SCAN_NAMES = (
+    "http_analysis", "content_analysis", "security_headers", "dns_analysis",
+    "ssl_analysis", "domain_reputation", "malware_detection",
+    "phishing_detection", "social_engineering"
+)
+
+# Suspicious domain shapes: (pattern, weight, description), matched against the lowercased domain
+PHISHING_DOMAIN_PATTERNS = tuple((re.compile(pattern), weight, description) for pattern, weight, description in (
+    (r".*-.*-.*-.*", 15, "Multiple hyphens"),
+    (r".*\d{4,}.*", 10, "Long number sequences"),
+    (r".*(secure|verify|update|confirm|login|account).*", 20, "Phishing keywords in domain"),
+    (r".*[0-9]{2,}[a-z]{1,2}[0-9]{2,}.*", 12, "Mixed alphanumeric patterns"),
+    (r".*\.(tk|ml|ga|cf)$", 18, "Suspicious TLD")
+))
+
+# Score bands: bisect_right(thresholds, score) indexes the parallel label tuple
+GRADE_THRESHOLDS = (50, 60, 65, 70, 75, 80, 85, 90, 95)
+GRADE_LABELS = ("F", "D", "C", "C+", "B-", "B", "B+", "A-", "A", "A+")
+RISK_LEVEL_THRESHOLDS = (40, 60, 75, 90)
+RISK_LEVEL_LABELS = ("critical", "high", "medium", "low", "very_low")
+SECURITY_RECOMMENDATIONS = (
+    "Critical security risks. Do not proceed. Report to security authorities if suspicious.",
+    "Significant security risks detected. Avoid sensitive transactions and verify legitimacy.",
+    "Moderate security concerns. Exercise increased caution and verify through alternative channels.",
+    "Good security practices. Monitor for changes and verify important transactions.",
+    "Excellent security posture. Safe to proceed with normal caution."
+)
+
+# Phrases flagged by the content scan, matched against the lowercased page
+SUSPICIOUS_KEYWORDS = (
+    "download now", "click here", "free download", "virus detected",
+    "your computer is infected", "security alert", "update required",
+    "congratulations", "you've won", "claim your prize"
+)
+
+def _build_keyword_automaton():
+    """Build a single automaton matching every suspicious keyword in one pass"""
+    automaton = ahocorasick.Automaton()
+    for keyword in SUSPICIOUS_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Only these tags (plus anything carrying an inline style) are inspected by
+# the content scans, so the parser skips building the rest of the tree.
+# Images, links and inline styles are only counted, never inspected.
+INSPECTED_TAGS = frozenset({'title', 'meta', 'form', 'script', 'iframe'})
+RELEVANT_TAGS = INSPECTED_TAGS | {'img', 'a'}
+RELEVANT_SELECTOR = ", ".join(sorted(RELEVANT_TAGS)) + ", [style]"
+HIDDEN_STYLE_PATTERN = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden")
+
+INSPECTED_TAGS_STRAINER = SoupStrainer(sorted(INSPECTED_TAGS))
+
+def _is_external_href(href: str, base_domain: str) -> bool:
+    return href.startswith('http') and base_domain not in href
+
+# External links are counted with a single bytes regex over the lowercased page.
+# Set COUNT_LINKS_FROM_DOM to count them from the parsed anchors instead.
+COUNT_LINKS_FROM_DOM = False
+EXTERNAL_HREF_PATTERN = re.compile(rb"""<a\b[^>]*\bhref\s*=\s*["']?(https?://[^"'>\s]+)""")
+
+def count_external_hrefs(html_lower: bytes, base_domain: str) -> int:
+    """Count absolute anchor hrefs that point away from base_domain"""
+    domain = base_domain.lower().encode()
+    return sum(1 for m in EXTERNAL_HREF_PATTERN.finditer(html_lower) if domain not in m.group(1))
+
+def html_stats(html_bytes: bytes, charset: str, base_domain: Optional[str] = None) -> Dict[str, int]:
+    """Count images, hidden elements and (given base_domain) external links in one streaming lxml pass"""
+    stats = {"images": 0, "external_links": 0, "hidden_elements": 0}
+    
+    for _, element in etree.iterparse(io.BytesIO(html_bytes), events=('end',), html=True,
+                                      recover=True, encoding=charset):
+        tag = element.tag
+        if tag == 'img':
+            stats["images"] += 1
+        elif tag == 'a' and base_domain is not None:
+            href = element.get('href')
+            if href and _is_external_href(href, base_domain):
+                stats["external_links"] += 1
+        style = element.get('style')
+        if style and HIDDEN_STYLE_PATTERN.search(style):
+            stats["hidden_elements"] += 1
+        
+        # Drop finished elements so the document is never held as a full tree
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    
+    return stats
+
+def _element_attrs(element) -> Dict:
+    """Attribute mapping of a parsed element (bs4 Tag or selectolax Node)"""
+    return element.attrs if isinstance(element, Tag) else element.attributes
+
+def _element_text(element) -> str:
+    """Text content of a parsed element (bs4 Tag or selectolax Node)"""
+    return element.get_text() if isinstance(element, Tag) else element.text()
+
+def _flatten_cert_name(name) -> Dict[str, str]:
+    """Flatten getpeercert()'s tuple of RDNs, e.g. ((('commonName', 'x'),),), into a dict"""
+    return {key: value for rdn in name for key, value in rdn}
+
+class NoDelayTCPConnector(aiohttp.TCPConnector):
+    """TCPConnector that disables Nagle's algorithm on every new connection"""
+    
+    async def _wrap_create_connection(self, *args, **kwargs):
+        transport, protocol = await super()._wrap_create_connection(*args, **kwargs)
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        return transport, protocol
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    """Single HTTP fetch of the target page, shared by every content-based scan"""
+    status: int
+    headers: Any
+    history: tuple
+    final_url: str
+    html_bytes: bytes
+    html: str
+    html_lower: bytes
+    truncated: bool
+    charset: str
+    http_version: str
+    cookies_count: int
+    fetch_ms: int
+
 class AdvancedWebScanner:
     """
     Comprehensive web security scanner with 9 different scan types:
@@ -31,18 +329,47 @@ class AdvancedWebScanner:
     
     def __init__(self):
         self.session = None
-        self.malware_patterns = self._load_malware_patterns()
-        self.phishing_indicators = self._load_phishing_indicators()
-        self.social_engineering_patterns = self._load_social_engineering_patterns()
+        self.malware_patterns = MALWARE_PATTERNS
+        self.phishing_indicators = PHISHING_INDICATORS
+        self.social_engineering_patterns = SOCIAL_ENGINEERING_PATTERNS
+        
+        # Compile once (used in-process if the worker pool is unavailable)
+        self._page_patterns = compile_page_patterns(
+            self.malware_patterns, self.social_engineering_patterns
+        )
+        
+        # CPU-bound pattern passes run in worker processes so they don't
+        # serialize on the GIL; workers compile patterns once. Created on first
+        # scan so importing this module never starts processes.
+        self._pool: Optional[ProcessPoolExecutor] = None
         
-    async def comprehensive_scan(self, url: str) -> Dict[str, Any]:
+        # Per-domain caches for DNS answers and TLS handshakes. Only touched from
+        # the event loop, so plain dicts are safe without a lock.
+        self.dns_cache = {}
+        self.ssl_cache = {}
+        
+        # Whole-scan results per URL, kept for SCAN_CACHE_TTL seconds
+        self.scan_cache = {}
+        
+        # One async resolver reused across scans (keeps its parsed resolv.conf)
+        self.resolver = dns.asyncresolver.Resolver()
+        
+    async def comprehensive_scan(self, url: str, force_refresh: bool = False) -> Dict[str, Any]:
         """Multi-layer comprehensive website security analysis"""
         
-        start_time = time.time()
+        # Repeat scans of the same URL within a short window are served from cache;
+        # callers get a deep copy so they can never mutate the cached result
+        if not force_refresh:
+            cached = self._get_cached_entry(self.scan_cache, url, SCAN_CACHE_TTL)
+            if cached is not None:
+                logger.info(f"⚡ Serving cached comprehensive scan for: {url}")
+                return copy.deepcopy(cached)
+        
+        start_ns = time.perf_counter_ns()
         logger.info(f"🔍 Starting comprehensive scan for: {url}")
         
         # Create persistent session for better performance
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+        connector = NoDelayTCPConnector(limit=20, limit_per_host=10)
         timeout = aiohttp.ClientTimeout(total=15, connect=5)
         
         async with aiohttp.ClientSession(
@@ -56,18 +383,35 @@ class AdvancedWebScanner:
             }
         ) as session:
             self.session = session
+            domain = urlparse(url).netloc
+            
+            # Download and parse the page once; every content-based scan reuses
+            # this request-scoped snapshot and DOM tree
+            try:
+                snapshot = await self._fetch_once(url)
+                tree = self._parse_html(snapshot)
+                fetch_error = None
+            except Exception as e:
+                snapshot = tree = None
+                fetch_error = str(e) or type(e).__name__
+                logger.warning(f"⚠️ Page fetch failed for {url}: {fetch_error}")
+            
+            def page_scan(scan, scan_type: str, *extra):
+                if snapshot is None:
+                    return self._fetch_failed(scan_type, fetch_error)
+                return scan(url, snapshot, *extra)
             
             # Run all 9 scan types in parallel
             tasks = [
-                self._http_analysis(url),           # 1. HTTP Analysis
-                self._content_analysis(url),        # 2. Content Analysis
-                self._security_headers_scan(url),   # 3. Security Headers
-                self._dns_analysis(url),            # 4. DNS Analysis
-                self._ssl_analysis(url),            # 5. SSL Analysis
-                self._domain_reputation(url),       # 6. Domain Reputation
-                self._malware_detection(url),       # 7. Malware Detection
-                self._phishing_detection(url),      # 8. Phishing Detection
-                self._social_engineering_scan(url)  # 9. Social Engineering
+                page_scan(self._http_analysis, "http_analysis"),                # 1. HTTP Analysis
+                page_scan(self._content_analysis, "content_analysis", tree, domain),  # 2. Content Analysis
+                page_scan(self._security_headers_scan, "security_headers"),     # 3. Security Headers
+                self._dns_analysis(domain),                                     # 4. DNS Analysis
+                self._ssl_analysis(domain),                                     # 5. SSL Analysis
+                self._domain_reputation(url),                                   # 6. Domain Reputation
+                page_scan(self._malware_detection, "malware_detection"),        # 7. Malware Detection
+                page_scan(self._phishing_detection, "phishing_detection", domain),  # 8. Phishing Detection
+                page_scan(self._social_engineering_scan, "social_engineering", tree)  # 9. Social Engineering
             ]
             
             logger.info("🚀 Running 9 parallel security scans")
@@ -76,7 +420,7 @@ class AdvancedWebScanner:
             # Compile comprehensive results
             compiled_results = self._compile_scan_results(url, results)
             
-            scan_time = int((time.time() - start_time) * 1000)
+            scan_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             compiled_results["scan_performance"] = {
                 "total_time_ms": scan_time,
                 "parallel_scans": 9,
@@ -85,121 +429,187 @@ class AdvancedWebScanner:
             }
             
             logger.info(f"✅ Comprehensive scan completed in {scan_time}ms")
-            return compiled_results
+            
+            # Failed fetches are not cached so a transient error is retried next time
+            if snapshot is not None:
+                self._cache_entry(self.scan_cache, url, compiled_results, MAX_SCAN_CACHE_SIZE)
+            return copy.deepcopy(compiled_results)
+    
+    async def _fetch_once(self, url: str) -> PageSnapshot:
+        """Fetch the target page a single time and capture everything the scans need"""
+        start_ns = time.perf_counter_ns()
+        async with self.session.get(url, allow_redirects=True) as response:
+            fetch_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            # Stream the body with a hard cap so one huge page cannot pin the scans
+            buffer = bytearray()
+            truncated = False
+            async for chunk in response.content.iter_chunked(65536):
+                buffer += chunk
+                if len(buffer) >= MAX_PAGE_BYTES:
+                    truncated = True
+                    break
+            html_bytes = bytes(buffer[:MAX_PAGE_BYTES])
+            charset = response.charset or 'utf-8'
+            
+            return PageSnapshot(
+                status=response.status,
+                headers=response.headers,
+                history=tuple(str(r.url) for r in response.history),
+                final_url=str(response.url),
+                html_bytes=html_bytes,
+                html=html_bytes.decode(charset, errors='replace'),
+                html_lower=html_bytes.lower(),
+                truncated=truncated,
+                charset=charset,
+                http_version=f"HTTP/{response.version.major}.{response.version.minor}",
+                cookies_count=len(response.cookies),
+                fetch_ms=fetch_ms
+            )
+    
+    def _parse_html(self, snapshot: PageSnapshot):
+        """Build the DOM tree once (selectolax when installed, otherwise bs4 + lxml)"""
+        if SELECTOLAX_AVAILABLE:
+            return LexborHTMLParser(snapshot.html)
+        
+        # bs4 only materialises the inspected tags; counted ones come from html_stats.
+        # Pass the known charset so bs4 skips encoding detection
+        return BeautifulSoup(
+            snapshot.html_bytes, 'lxml',
+            parse_only=INSPECTED_TAGS_STRAINER,
+            from_encoding=snapshot.charset
+        )
+    
+    def _bucket_elements(self, tree, snapshot: PageSnapshot, domain: str):
+        """Group the inspected elements by tag and count images, external links and hidden elements"""
+        elements = defaultdict(list)
+        
+        if isinstance(tree, BeautifulSoup):
+            for tag in tree.find_all(True):
+                elements[tag.name].append(tag)
+            counts = html_stats(snapshot.html_bytes, snapshot.charset, domain if COUNT_LINKS_FROM_DOM else None)
+        else:
+            hidden_elements = 0
+            for node in tree.css(RELEVANT_SELECTOR):
+                elements[node.tag].append(node)
+                style = node.attributes.get('style')
+                if style and HIDDEN_STYLE_PATTERN.search(style):
+                    hidden_elements += 1
+            
+            counts = {
+                "images": len(elements['img']),
+                "external_links": self._count_external_links(elements['a'], domain) if COUNT_LINKS_FROM_DOM else 0,
+                "hidden_elements": hidden_elements
+            }
+        
+        if not COUNT_LINKS_FROM_DOM:
+            counts["external_links"] = count_external_hrefs(snapshot.html_lower, domain)
+        return elements, counts
     
-    async def _http_analysis(self, url: str) -> Dict:
+    async def _fetch_failed(self, scan_type: str, error: str) -> Dict:
+        """Result for a content-based scan when the shared page fetch failed"""
+        return {"error": f"Page fetch failed: {error}", "scan_type": scan_type}
+    
+    async def _http_analysis(self, url: str, snapshot: PageSnapshot) -> Dict:
         """1. HTTP Response and Performance Analysis"""
         try:
-            start_time = time.time()
-            async with self.session.get(url, allow_redirects=True) as response:
-                response_time = int((time.time() - start_time) * 1000)
-                
-                return {
-                    "status_code": response.status,
-                    "response_time_ms": response_time,
-                    "content_length": len(await response.text()),
-                    "content_type": response.headers.get('content-type', ''),
-                    "server": response.headers.get('server', 'unknown'),
-                    "redirects_count": len(response.history),
-                    "final_url": str(response.url),
-                    "http_version": f"HTTP/{response.version.major}.{response.version.minor}",
-                    "cookies_count": len(response.cookies),
-                    "performance_grade": "A" if response_time < 500 else "B" if response_time < 1500 else "C"
-                }
+            response_time = snapshot.fetch_ms
+            
+            return {
+                "status_code": snapshot.status,
+                "response_time_ms": response_time,
+                "content_length": len(snapshot.html_bytes),
+                "content_truncated": snapshot.truncated,
+                "content_type": snapshot.headers.get('content-type', ''),
+                "server": snapshot.headers.get('server', 'unknown'),
+                "redirects_count": len(snapshot.history),
+                "final_url": snapshot.final_url,
+                "http_version": snapshot.http_version,
+                "cookies_count": snapshot.cookies_count,
+                "performance_grade": "A" if response_time < 500 else "B" if response_time < 1500 else "C"
+            }
         except Exception as e:
             return {"error": str(e), "scan_type": "http_analysis"}
     
-    async def _content_analysis(self, url: str) -> Dict:
+    async def _content_analysis(self, url: str, snapshot: PageSnapshot, tree, domain: str) -> Dict:
         """2. Deep HTML Content Analysis"""
         try:
-            async with self.session.get(url) as response:
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Analyze content structure
-                forms = soup.find_all('form')
-                scripts = soup.find_all('script')
-                iframes = soup.find_all('iframe')
-                
-                # Security-relevant content analysis
-                return {
-                    "page_title": soup.title.string.strip() if soup.title else "",
-                    "meta_description": self._get_meta_content(soup, 'description'),
-                    "meta_keywords": self._get_meta_content(soup, 'keywords'),
-                    "forms_count": len(forms),
-                    "login_forms": len([f for f in forms if self._is_login_form(f)]),
-                    "payment_forms": len([f for f in forms if self._is_payment_form(f)]),
-                    "external_scripts": self._count_external_scripts(scripts, url),
-                    "suspicious_iframes": self._analyze_suspicious_iframes(iframes),
-                    "hidden_elements": len(soup.find_all(attrs={"style": re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden")})),
-                    "external_links": self._count_external_links(soup, url),
-                    "images_count": len(soup.find_all('img')),
-                    "content_language": soup.get('lang', 'unknown'),
-                    "suspicious_keywords": self._scan_suspicious_keywords(html),
-                    "obfuscated_code": self._detect_code_obfuscation(html)
-                }
+            html = snapshot.html
+            
+            # Analyze content structure in a single traversal
+            elements, counts = self._bucket_elements(tree, snapshot, domain)
+            forms = elements['form']
+            scripts = elements['script']
+            iframes = elements['iframe']
+            titles = elements['title']
+            
+            # Security-relevant content analysis
+            return {
+                "page_title": _element_text(titles[0]).strip() if titles else "",
+                "meta_description": self._get_meta_content(elements['meta'], 'description'),
+                "meta_keywords": self._get_meta_content(elements['meta'], 'keywords'),
+                "forms_count": len(forms),
+                "login_forms": len([f for f in forms if self._is_login_form(f)]),
+                "payment_forms": len([f for f in forms if self._is_payment_form(f)]),
+                "external_scripts": self._count_external_scripts(scripts, url),
+                "suspicious_iframes": self._analyze_suspicious_iframes(iframes),
+                "hidden_elements": counts["hidden_elements"],
+                "external_links": counts["external_links"],
+                "images_count": counts["images"],
+                "content_language": self._get_content_language(tree),
+                "suspicious_keywords": self._scan_suspicious_keywords(snapshot.html_lower),
+                "obfuscated_code": self._detect_code_obfuscation(html)
+            }
         except Exception as e:
             return {"error": str(e), "scan_type": "content_analysis"}
     
-    async def _security_headers_scan(self, url: str) -> Dict:
+    async def _security_headers_scan(self, url: str, snapshot: PageSnapshot) -> Dict:
         """3. Comprehensive Security Headers Analysis"""
         try:
-            async with self.session.get(url) as response:
-                headers = dict(response.headers)
-                
-                security_score = 100
-                security_issues = []
-                recommendations = []
-                
-                # Critical security headers
-                critical_headers = {
-                    'Strict-Transport-Security': {'weight': 25, 'description': 'HSTS protection'},
-                    'Content-Security-Policy': {'weight': 20, 'description': 'XSS/injection protection'},
-                    'X-Frame-Options': {'weight': 15, 'description': 'Clickjacking protection'},
-                    'X-Content-Type-Options': {'weight': 10, 'description': 'MIME sniffing protection'},
-                    'X-XSS-Protection': {'weight': 10, 'description': 'XSS filtering'},
-                    'Referrer-Policy': {'weight': 10, 'description': 'Referrer information control'},
-                    'Permissions-Policy': {'weight': 10, 'description': 'Browser feature control'}
-                }
-                
-                for header, info in critical_headers.items():
-                    if header not in headers:
-                        security_score -= info['weight']
-                        security_issues.append(f"Missing {header}")
-                        recommendations.append(f"Add {header} for {info['description']}")
-                
-                # Analyze existing headers quality
-                header_quality = self._analyze_header_quality(headers)
-                
-                return {
-                    "security_score": max(0, security_score),
-                    "grade": self._get_security_grade(security_score),
-                    "missing_headers": security_issues,
-                    "recommendations": recommendations,
-                    "header_analysis": header_quality,
-                    "total_headers": len(headers),
-                    "security_headers_present": len([h for h in critical_headers if h in headers])
-                }
+            headers = dict(snapshot.headers)
+            
+            security_score = 100
+            security_issues = []
+            recommendations = []
+            
+            # Critical security headers
+            critical_headers = {
+                'Strict-Transport-Security': {'weight': 25, 'description': 'HSTS protection'},
+                'Content-Security-Policy': {'weight': 20, 'description': 'XSS/injection protection'},
+                'X-Frame-Options': {'weight': 15, 'description': 'Clickjacking protection'},
+                'X-Content-Type-Options': {'weight': 10, 'description': 'MIME sniffing protection'},
+                'X-XSS-Protection': {'weight': 10, 'description': 'XSS filtering'},
+                'Referrer-Policy': {'weight': 10, 'description': 'Referrer information control'},
+                'Permissions-Policy': {'weight': 10, 'description': 'Browser feature control'}
+            }
+            
+            for header, info in critical_headers.items():
+                if header not in headers:
+                    security_score -= info['weight']
+                    security_issues.append(f"Missing {header}")
+                    recommendations.append(f"Add {header} for {info['description']}")
+            
+            # Analyze existing headers quality
+            header_quality = self._analyze_header_quality(headers)
+            
+            return {
+                "security_score": max(0, security_score),
+                "grade": self._get_security_grade(security_score),
+                "missing_headers": security_issues,
+                "recommendations": recommendations,
+                "header_analysis": header_quality,
+                "total_headers": len(headers),
+                "security_headers_present": len([h for h in critical_headers if h in headers])
+            }
         except Exception as e:
             return {"error": str(e), "scan_type": "security_headers"}
     
-    async def _dns_analysis(self, url: str) -> Dict:
+    async def _dns_analysis(self, domain: str) -> Dict:
         """4. Advanced DNS and Domain Analysis"""
         try:
-            domain = urlparse(url).netloc
-            
-            # DNS record analysis
-            dns_records = {}
-            record_types = ['A', 'AAAA', 'MX', 'TXT', 'NS', 'CNAME', 'SOA']
-            
-            for record_type in record_types:
-                try:
-                    answers = dns.resolver.resolve(domain, record_type)
-                    dns_records[record_type] = [str(rdata) for rdata in answers]
-                except dns.resolver.NXDOMAIN:
-                    dns_records[record_type] = ["NXDOMAIN"]
-                except Exception:
-                    dns_records[record_type] = []
+            # DNS record analysis (all record types resolved in parallel)
+            answers = await asyncio.gather(*[self._resolve(domain, t) for t in DNS_RECORD_TYPES])
+            dns_records = dict(zip(DNS_RECORD_TYPES, answers))
             
             # Suspicious DNS analysis
             dns_suspicion_score = self._analyze_dns_suspicion(dns_records, domain)
@@ -217,87 +627,136 @@ class AdvancedWebScanner:
         except Exception as e:
             return {"error": str(e), "scan_type": "dns_analysis"}
     
-    async def _ssl_analysis(self, url: str) -> Dict:
+    async def _ssl_analysis(self, domain: str) -> Dict:
         """5. Advanced SSL/TLS Certificate Analysis"""
         try:
-            domain = urlparse(url).netloc
-            port = 443
-            
             # Get SSL certificate details
-            context = ssl.create_default_context()
+            cert, cipher = await self._ssl_probe(domain)
             
-            with socket.create_connection((domain, port), timeout=5) as sock:
-                with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                    cert = ssock.getpeercert()
-                    cipher = ssock.cipher()
-                    
-                    # Analyze certificate
-                    cert_analysis = self._analyze_certificate(cert)
-                    
-                    return {
-                        "ssl_valid": True,
-                        "certificate": {
-                            "subject": dict(x for x in cert.get('subject', []))[0],
-                            "issuer": dict(x for x in cert.get('issuer', []))[0],
-                            "version": cert.get('version'),
-                            "serial_number": cert.get('serialNumber'),
-                            "not_before": cert.get('notBefore'),
-                            "not_after": cert.get('notAfter'),
-                            "signature_algorithm": cert.get('signatureAlgorithm')
-                        },
-                        "cipher_suite": {
-                            "name": cipher[0] if cipher else "unknown",
-                            "version": cipher[1] if cipher else "unknown",
-                            "bits": cipher[2] if cipher else 0
-                        },
-                        "certificate_analysis": cert_analysis,
-                        "ssl_grade": self._calculate_ssl_grade(cert, cipher)
-                    }
+            # Analyze certificate
+            cert_analysis = self._analyze_certificate(cert)
+            
+            return {
+                "ssl_valid": True,
+                "certificate": {
+                    "subject": _flatten_cert_name(cert.get('subject', ())),
+                    "issuer": _flatten_cert_name(cert.get('issuer', ())),
+                    "version": cert.get('version'),
+                    "serial_number": cert.get('serialNumber'),
+                    "not_before": cert.get('notBefore'),
+                    "not_after": cert.get('notAfter'),
+                    "signature_algorithm": cert.get('signatureAlgorithm')
+                },
+                "cipher_suite": {
+                    "name": cipher[0] if cipher else "unknown",
+                    "version": cipher[1] if cipher else "unknown",
+                    "bits": cipher[2] if cipher else 0
+                },
+                "certificate_analysis": cert_analysis,
+                "ssl_grade": self._calculate_ssl_grade(cert, cipher)
+            }
         except Exception as e:
             return {"ssl_valid": False, "error": str(e), "scan_type": "ssl_analysis"}
     
-    async def _malware_detection(self, url: str) -> Dict:
+    async def _resolve(self, domain: str, record_type: str) -> List[str]:
+        """Resolve one DNS record type, served from the per-domain cache when fresh"""
+        cache_key = (domain, record_type)
+        cached = self._get_cached_entry(self.dns_cache, cache_key, DNS_CACHE_TTLS.get(record_type, 300))
+        if cached is not None:
+            return cached
+        
+        try:
+            answers = await self.resolver.resolve(domain, record_type)
+            records = [str(rdata) for rdata in answers]
+        except dns.resolver.NXDOMAIN:
+            records = ["NXDOMAIN"]
+        except (dns.resolver.NoAnswer, dns.resolver.NoNameservers):
+            records = []
+        except Exception:
+            # Timeouts and other transient failures are not cached
+            return []
+        
+        self._cache_entry(self.dns_cache, cache_key, records)
+        return records
+    
+    async def _ssl_probe(self, domain: str):
+        """TLS handshake returning (certificate, cipher), cached per domain"""
+        cached = self._get_cached_entry(self.ssl_cache, domain, SSL_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        def handshake():
+            context = ssl.create_default_context()
+            with socket.create_connection((domain, 443), timeout=5) as sock:
+                with context.wrap_socket(sock, server_hostname=domain) as ssock:
+                    return ssock.getpeercert(), ssock.cipher()
+        
+        result = await asyncio.to_thread(handshake)
+        self._cache_entry(self.ssl_cache, domain, result)
+        return result
+    
+    def _get_cached_entry(self, cache: Dict, key, ttl: int):
+        """Get a cached lookup if still within its TTL, marking it recently used"""
+        cached = cache.pop(key, None)
+        if cached is None or time.time() - cached["timestamp"] > ttl:
+            return None
+        
+        cache[key] = cached
+        return cached["data"]
+    
+    def _cache_entry(self, cache: Dict, key, data, max_size: int = MAX_DOMAIN_CACHE_SIZE):
+        """Cache a lookup result with timestamp"""
+        
+        # Bounded LRU: the dict keeps least recently used entries first
+        cache.pop(key, None)
+        if len(cache) >= max_size:
+            del cache[next(iter(cache))]
+        
+        cache[key] = {
+            "data": data,
+            "timestamp": time.time()
+        }
+    
+    async def _malware_detection(self, url: str, snapshot: PageSnapshot) -> Dict:
         """7. Advanced Malware Pattern Detection"""
         try:
-            async with self.session.get(url) as response:
-                content = await response.text()
-                
-                malware_indicators = 0
-                detected_patterns = []
-                severity_scores = []
-                
-                for pattern_name, pattern_info in self.malware_patterns.items():
-                    pattern = pattern_info['pattern']
-                    severity = pattern_info['severity']
-                    
-                    matches = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-                    if matches:
-                        malware_indicators += len(matches)
-                        detected_patterns.append({
-                            "pattern": pattern_name,
-                            "matches": len(matches),
-                            "severity": severity,
-                            "description": pattern_info['description']
-                        })
-                        severity_scores.append(severity)
-                
-                avg_severity = sum(severity_scores) / len(severity_scores) if severity_scores else 0
+            content = snapshot.html_lower
+            
+            malware_indicators = 0
+            detected_patterns = []
+            severity_scores = []
+            
+            match_counts = await self._run_pattern_scan("malware", content)
+            
+            for pattern in self.malware_patterns:
+                severity = pattern.weight
                 
-                return {
-                    "malware_score": min(100, malware_indicators * 8),
-                    "detected_patterns": detected_patterns,
-                    "pattern_count": malware_indicators,
-                    "average_severity": round(avg_severity, 1),
-                    "risk_level": self._get_malware_risk_level(malware_indicators, avg_severity)
-                }
+                matches = match_counts.get(pattern.name, 0)
+                if matches:
+                    malware_indicators += matches
+                    detected_patterns.append({
+                        "pattern": pattern.name,
+                        "matches": matches,
+                        "severity": severity,
+                        "description": pattern.description
+                    })
+                    severity_scores.append(severity)
+            
+            avg_severity = sum(severity_scores) / len(severity_scores) if severity_scores else 0
+            
+            return {
+                "malware_score": min(100, malware_indicators * 8),
+                "detected_patterns": detected_patterns,
+                "pattern_count": malware_indicators,
+                "average_severity": round(avg_severity, 1),
+                "risk_level": self._get_malware_risk_level(malware_indicators, avg_severity)
+            }
         except Exception as e:
             return {"error": str(e), "scan_type": "malware_detection"}
     
-    async def _phishing_detection(self, url: str) -> Dict:
+    async def _phishing_detection(self, url: str, snapshot: PageSnapshot, domain: str) -> Dict:
         """8. Advanced Phishing Detection"""
         try:
-            domain = urlparse(url).netloc
-            
             phishing_score = 0
             indicators = []
             
@@ -312,12 +771,9 @@ class AdvancedWebScanner:
             indicators.extend(url_analysis['indicators'])
             
             # Content-based analysis
-            async with self.session.get(url) as response:
-                content = await response.text()
-                
-                content_analysis = self._analyze_content_for_phishing(content)
-                phishing_score += content_analysis['score']
-                indicators.extend(content_analysis['indicators'])
+            content_analysis = self._analyze_content_for_phishing(snapshot.html)
+            phishing_score += content_analysis['score']
+            indicators.extend(content_analysis['indicators'])
             
             return {
                 "phishing_score": min(100, phishing_score),
@@ -330,169 +786,70 @@ class AdvancedWebScanner:
         except Exception as e:
             return {"error": str(e), "scan_type": "phishing_detection"}
     
-    async def _social_engineering_scan(self, url: str) -> Dict:
+    async def _social_engineering_scan(self, url: str, snapshot: PageSnapshot, tree) -> Dict:
         """9. Social Engineering Attack Detection"""
         try:
-            async with self.session.get(url) as response:
-                content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                social_eng_score = 0
-                detected_tactics = []
-                
-                # Check for social engineering patterns
-                for tactic_name, pattern_info in self.social_engineering_patterns.items():
-                    pattern = pattern_info['pattern']
-                    weight = pattern_info['weight']
-                    
-                    if re.search(pattern, content, re.IGNORECASE):
-                        social_eng_score += weight
-                        detected_tactics.append({
-                            "tactic": tactic_name,
-                            "description": pattern_info['description'],
-                            "weight": weight
-                        })
-                
-                # Analyze forms for social engineering
-                forms_analysis = self._analyze_forms_social_engineering(soup)
-                social_eng_score += forms_analysis['score']
-                detected_tactics.extend(forms_analysis['tactics'])
+            content = snapshot.html_lower
+            
+            social_eng_score = 0
+            detected_tactics = []
+            
+            # Check for social engineering patterns
+            matched_tactics = set(await self._run_pattern_scan("social_engineering", content))
+            
+            for tactic in self.social_engineering_patterns:
+                weight = tactic.weight
                 
-                return {
-                    "social_engineering_score": min(100, social_eng_score),
-                    "detected_tactics": detected_tactics,
-                    "tactic_count": len(detected_tactics),
-                    "risk_assessment": self._get_social_eng_risk(social_eng_score)
-                }
+                if tactic.name in matched_tactics:
+                    social_eng_score += weight
+                    detected_tactics.append({
+                        "tactic": tactic.name,
+                        "description": tactic.description,
+                        "weight": weight
+                    })
+            
+            # Analyze forms for social engineering
+            forms_analysis = self._analyze_forms_social_engineering(tree)
+            social_eng_score += forms_analysis['score']
+            detected_tactics.extend(forms_analysis['tactics'])
+            
+            return {
+                "social_engineering_score": min(100, social_eng_score),
+                "detected_tactics": detected_tactics,
+                "tactic_count": len(detected_tactics),
+                "risk_assessment": self._get_social_eng_risk(social_eng_score)
+            }
         except Exception as e:
             return {"error": str(e), "scan_type": "social_engineering"}
     
-    def _load_malware_patterns(self) -> Dict[str, Dict]:
-        """Load comprehensive malware detection patterns"""
-        return {
-            "base64_payload": {
-                "pattern": r"eval\s*\(\s*base64_decode|atob\s*\(",
-                "severity": 9,
-                "description": "Base64 encoded payload execution"
-            },
-            "obfuscated_javascript": {
-                "pattern": r"String\.fromCharCode\s*\(|\\x[0-9a-fA-F]{2}",
-                "severity": 8,
-                "description": "Obfuscated JavaScript code"
-            },
-            "malicious_iframe": {
-                "pattern": r"<iframe[^>]*(?:style\s*=\s*[\"'].*display\s*:\s*none|width\s*=\s*[\"']?0|height\s*=\s*[\"']?0)",
-                "severity": 8,
-                "description": "Hidden malicious iframe"
-            },
-            "crypto_mining": {
-                "pattern": r"(coinhive|cryptoloot|coin-hive|minergate|cryptonight)",
-                "severity": 7,
-                "description": "Cryptocurrency mining code"
-            },
-            "shell_injection": {
-                "pattern": r"(system|exec|shell_exec|passthru|popen)\s*\(",
-                "severity": 10,
-                "description": "System command execution"
-            },
-            "sql_injection": {
-                "pattern": r"(union\s+select|drop\s+table|delete\s+from|insert\s+into).*[\"'][^\"']*[\"']",
-                "severity": 9,
-                "description": "SQL injection patterns"
-            },
-            "xss_vectors": {
-                "pattern": r"<script[^>]*>.*?(alert|prompt|confirm|document\.cookie)\s*\(",
-                "severity": 7,
-                "description": "Cross-site scripting vectors"
-            },
-            "malicious_redirects": {
-                "pattern": r"window\.location\s*=\s*[\"'][^\"']*(?:bit\.ly|tinyurl|t\.co)",
-                "severity": 6,
-                "description": "Suspicious redirect patterns"
-            }
-        }
-    
-    def _load_phishing_indicators(self) -> Dict[str, Dict]:
-        """Load advanced phishing detection patterns"""
-        return {
-            "urgent_action": {
-                "pattern": r"(urgent|immediate|expires?|suspend|verify|confirm|act\s+now).*(?:account|payment|security)",
-                "weight": 20,
-                "description": "Urgency-based social engineering"
-            },
-            "fake_authentication": {
-                "pattern": r"(?:login|sign\s*in|log\s*in).*(?:paypal|amazon|microsoft|google|apple|facebook|twitter)",
-                "weight": 25,
-                "description": "Fake authentication pages"
-            },
-            "prize_lottery_scam": {
-                "pattern": r"(congratulations|winner|prize|lottery|selected|won).*(?:\$|money|cash|reward)",
-                "weight": 18,
-                "description": "Prize/lottery scam indicators"
-            },
-            "payment_fraud": {
-                "pattern": r"(payment|billing|invoice|overdue|refund|transaction).*(?:failed|pending|suspended)",
-                "weight": 22,
-                "description": "Payment fraud indicators"
-            },
-            "security_scare": {
-                "pattern": r"(security\s+alert|account\s+(?:locked|compromised)|suspicious\s+activity|unauthorized\s+access)",
-                "weight": 20,
-                "description": "Fake security alerts"
-            },
-            "download_trojan": {
-                "pattern": r"(?:download|install|update).*(?:urgent|required|security|antivirus|player|codec)",
-                "weight": 15,
-                "description": "Malicious download bait"
-            }
-        }
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the scan worker pool, creating it on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=SCAN_WORKERS,
+                mp_context=multiprocessing.get_context(SCAN_WORKER_START_METHOD),
+                initializer=_init_scan_worker
+            )
+        return self._pool
     
-    def _load_social_engineering_patterns(self) -> Dict[str, Dict]:
-        """Load social engineering attack patterns"""
-        return {
-            "authority_impersonation": {
-                "pattern": r"(government|official|authority|police|fbi|irs|tax|legal).*(?:notice|warning|action)",
-                "weight": 25,
-                "description": "Authority figure impersonation"
-            },
-            "fear_uncertainty_doubt": {
-                "pattern": r"(warning|danger|risk|threat|compromise|breach|hack).*(?:immediate|urgent|now)",
-                "weight": 20,
-                "description": "Fear, uncertainty, and doubt tactics"
-            },
-            "artificial_scarcity": {
-                "pattern": r"(limited\s+time|expires?|only\s+\d+|last\s+chance|while\s+supplies)",
-                "weight": 15,
-                "description": "Artificial scarcity pressure"
-            },
-            "trust_exploitation": {
-                "pattern": r"(trusted|verified|certified|official|authorized).*(?:by|partner|member)",
-                "weight": 12,
-                "description": "False trust indicators"
-            },
-            "emotional_manipulation": {
-                "pattern": r"(help|save|donate|charity|victim|emergency|disaster)",
-                "weight": 10,
-                "description": "Emotional manipulation tactics"
-            }
-        }
+    async def _run_pattern_scan(self, kind: str, html: bytes):
+        """Run a pattern pass in the process pool, falling back to this process"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), _scan_worker, kind, html)
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️ Scan worker pool unavailable, scanning in-process: {e}")
+            return scan_page_patterns(kind, html, *self._page_patterns)
     
     def _analyze_domain_for_phishing(self, domain: str) -> Dict:
         """Analyze domain for phishing indicators"""
         score = 0
         indicators = []
+        domain = domain.lower()
         
         # Check for suspicious domain patterns
-        suspicious_patterns = [
-            (r".*-.*-.*-.*", 15, "Multiple hyphens"),
-            (r".*\d{4,}.*", 10, "Long number sequences"),
-            (r".*(secure|verify|update|confirm|login|account).*", 20, "Phishing keywords in domain"),
-            (r".*[0-9]{2,}[a-z]{1,2}[0-9]{2,}.*", 12, "Mixed alphanumeric patterns"),
-            (r".*\.(tk|ml|ga|cf)$", 18, "Suspicious TLD")
-        ]
-        
-        for pattern, weight, description in suspicious_patterns:
-            if re.match(pattern, domain, re.IGNORECASE):
+        for pattern, weight, description in PHISHING_DOMAIN_PATTERNS:
+            if pattern.match(domain):
                 score += weight
                 indicators.append(description)
         
@@ -505,12 +862,6 @@ class AdvancedWebScanner:
     def _compile_scan_results(self, url: str, results: List) -> Dict[str, Any]:
         """Compile all scan results into comprehensive security report"""
         
-        scan_names = [
-            "http_analysis", "content_analysis", "security_headers", "dns_analysis",
-            "ssl_analysis", "domain_reputation", "malware_detection", 
-            "phishing_detection", "social_engineering"
-        ]
-        
         compiled = {
             "url": url,
             "scan_timestamp": datetime.utcnow().isoformat(),
@@ -520,8 +871,8 @@ class AdvancedWebScanner:
         # Process each scan result
         successful_scans = 0
         for i, result in enumerate(results):
-            if i < len(scan_names):
-                scan_name = scan_names[i]
+            if i < len(SCAN_NAMES):
+                scan_name = SCAN_NAMES[i]
                 
                 if isinstance(result, dict) and "error" not in result:
                     compiled[scan_name] = result
@@ -535,9 +886,9 @@ class AdvancedWebScanner:
         # Calculate comprehensive security score
         compiled["comprehensive_analysis"] = self._calculate_comprehensive_score(compiled)
         compiled["scan_summary"] = {
-            "total_scans": len(scan_names),
+            "total_scans": len(SCAN_NAMES),
             "successful_scans": successful_scans,
-            "success_rate": round((successful_scans / len(scan_names)) * 100, 1)
+            "success_rate": round((successful_scans / len(SCAN_NAMES)) * 100, 1)
         }
         
         return compiled
@@ -605,72 +956,52 @@ class AdvancedWebScanner:
         }
     
     # Helper methods for analysis
-    def _get_meta_content(self, soup, name: str) -> str:
+    def _get_content_language(self, tree) -> str:
+        """Read the document language from the root element"""
+        if isinstance(tree, BeautifulSoup):
+            return tree.get('lang', 'unknown')
+        root = tree.root
+        return (root.attributes.get('lang') if root is not None else None) or 'unknown'
+    
+    def _get_meta_content(self, metas: List, name: str) -> str:
         """Extract meta tag content"""
-        meta = soup.find('meta', attrs={'name': name}) or soup.find('meta', attrs={'property': f'og:{name}'})
-        return meta.get('content', '') if meta else ''
+        meta = (next((m for m in metas if _element_attrs(m).get('name') == name), None)
+                or next((m for m in metas if _element_attrs(m).get('property') == f'og:{name}'), None))
+        return (_element_attrs(meta).get('content') or '') if meta else ''
     
-    def _count_external_links(self, soup, base_url: str) -> int:
+    def _count_external_links(self, anchors: List, base_domain: str) -> int:
         """Count external links"""
-        base_domain = urlparse(base_url).netloc
         external_count = 0
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if href.startswith('http') and base_domain not in href:
+        for link in anchors:
+            href = _element_attrs(link).get('href')
+            if not href:
+                continue
+            if _is_external_href(href, base_domain):
                 external_count += 1
         
         return external_count
     
-    def _scan_suspicious_keywords(self, content: str) -> List[str]:
-        """Scan for suspicious keywords in content"""
-        suspicious_keywords = [
-            "download now", "click here", "free download", "virus detected",
-            "your computer is infected", "security alert", "update required",
-            "congratulations", "you've won", "claim your prize"
-        ]
-        
-        found_keywords = []
-        content_lower = content.lower()
+    def _scan_suspicious_keywords(self, content: bytes) -> List[str]:
+        """Scan for suspicious keywords in the already-lowercased page body"""
+        if KEYWORD_AUTOMATON is not None:
+            # latin-1 maps every byte to one character, so ASCII keywords match unchanged
+            found = {keyword for _, keyword in KEYWORD_AUTOMATON.iter(content.decode('latin-1'))}
+            return [keyword for keyword in SUSPICIOUS_KEYWORDS if keyword in found]
         
-        for keyword in suspicious_keywords:
-            if keyword in content_lower:
-                found_keywords.append(keyword)
-        
-        return found_keywords
+        return [keyword for keyword in SUSPICIOUS_KEYWORDS if keyword.encode() in content]
     
     def _get_comprehensive_grade(self, score: int) -> str:
         """Get letter grade for comprehensive score"""
-        if score >= 95: return "A+"
-        if score >= 90: return "A"
-        if score >= 85: return "A-"
-        if score >= 80: return "B+"
-        if score >= 75: return "B"
-        if score >= 70: return "B-"
-        if score >= 65: return "C+"
-        if score >= 60: return "C"
-        return "D" if score >= 50 else "F"
+        return GRADE_LABELS[bisect.bisect_right(GRADE_THRESHOLDS, score)]
     
     def _get_comprehensive_risk_level(self, score: int) -> str:
         """Get risk level description"""
-        if score >= 90: return "very_low"
-        if score >= 75: return "low"
-        if score >= 60: return "medium"
-        if score >= 40: return "high"
-        return "critical"
+        return RISK_LEVEL_LABELS[bisect.bisect_right(RISK_LEVEL_THRESHOLDS, score)]
     
     def _get_security_recommendation(self, score: int) -> str:
         """Get security recommendation based on score"""
-        if score >= 90:
-            return "Excellent security posture. Safe to proceed with normal caution."
-        elif score >= 75:
-            return "Good security practices. Monitor for changes and verify important transactions."
-        elif score >= 60:
-            return "Moderate security concerns. Exercise increased caution and verify through alternative channels."
-        elif score >= 40:
-            return "Significant security risks detected. Avoid sensitive transactions and verify legitimacy."
-        else:
-            return "Critical security risks. Do not proceed. Report to security authorities if suspicious."
+        return SECURITY_RECOMMENDATIONS[bisect.bisect_right(RISK_LEVEL_THRESHOLDS, score)]
 
 # Global enhanced scanner instance
 advanced_scanner = AdvancedWebScanner()
\ No newline at end of file
@@ -1,22 +1,344 @@
 import os
-import json
+import re
+import orjson
 import time
+import hashlib
 import asyncio
-import requests
+import aiohttp
 import logging
-from typing import Dict, Any, Optional
-from urllib.parse import urlparse
+from contextlib import aclosing
+from dataclasses import dataclass, fields
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from functools import lru_cache
+from urllib.parse import urlparse, urlunparse
+from config import settings
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Raw bytes read from the page; enough for the 2000-character content sample
+FETCH_READ_BYTES = 4096
+
+# Request headers for the content fetch (built once, not per call)
+HEADERS = {
+    'User-Agent': 'ViralSafe-Enhanced-Scanner/3.1 (Security-Analysis)',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'no-cache',
+    # Hint that only the head of the page is needed; servers may ignore it
+    'Range': f'bytes=0-{FETCH_READ_BYTES - 1}'
+}
+
+# Same headers without Range, for servers that reject the range with 416
+PLAIN_HEADERS = {name: value for name, value in HEADERS.items() if name != 'Range'}
+
+# One pooled session shared by every analyzer instance, so keep-alive
+# connections, TLS sessions and DNS answers are reused across scans
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def _get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it on first use inside the event loop"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True
+            ),
+            timeout=aiohttp.ClientTimeout(total=8)
+        )
+    return _http_session
+
+# One Groq client per process (analyzers are built per request), plus whether
+# its connection has already been warmed
+_groq_client = None
+_groq_client_key: Optional[str] = None
+_groq_warm = False
+
+def _get_groq_client(api_key: str):
+    """Return the shared Groq client for this API key, creating it on first use"""
+    global _groq_client, _groq_client_key, _groq_warm
+    if _groq_client is None or _groq_client_key != api_key:
+        from groq import AsyncGroq
+        _groq_client = AsyncGroq(api_key=api_key)
+        _groq_client_key = api_key
+        _groq_warm = False
+        logger.info("✅ Groq AI client initialized successfully")
+    return _groq_client
+
+# Transient failures get one quick retry with exponential backoff
+FETCH_MAX_ATTEMPTS = 2
+FETCH_BACKOFF_BASE = 0.2
+FETCH_BACKOFF_MAX = 0.5
+RETRYABLE_FETCH_ERRORS = (aiohttp.ServerDisconnectedError, asyncio.TimeoutError)
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+# A host that keeps failing is skipped for a while instead of waiting out the timeout again
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_WINDOW = 60
+BREAKER_COOLDOWN = 60
+MAX_TRACKED_HOSTS = 1024
+
+class _CircuitBreaker:
+    """Consecutive-failure counter for one host"""
+    __slots__ = ("failures", "first_failure", "opened_at")
+    
+    def __init__(self):
+        self.failures = 0
+        self.first_failure = 0.0
+        self.opened_at = 0.0
+    
+    def is_open(self, now: float) -> bool:
+        if not self.opened_at:
+            return False
+        if now - self.opened_at < BREAKER_COOLDOWN:
+            return True
+        # Cooldown over: let the next fetch probe the host again
+        self.failures = 0
+        self.opened_at = 0.0
+        return False
+    
+    def record_failure(self, now: float):
+        if not self.failures or now - self.first_failure > BREAKER_WINDOW:
+            self.failures = 0
+            self.first_failure = now
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURE_THRESHOLD:
+            self.opened_at = now
+
+# Only hosts with recent failures are tracked; a successful fetch drops the entry
+_breakers: Dict[str, _CircuitBreaker] = {}
+
+def _get_breaker(host: str) -> _CircuitBreaker:
+    """Return the circuit breaker for a host, evicting the oldest entry when full"""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        if len(_breakers) >= MAX_TRACKED_HOSTS:
+            del _breakers[next(iter(_breakers))]
+        breaker = _breakers[host] = _CircuitBreaker()
+    return breaker
+
+# Trust score adjustment per HTTP status code; anything unlisted is -10
+STATUS_SCORE_DELTAS = {
+    200: 5,                                               # Bonus for successful response
+    301: -2, 302: -2, 303: -2, 307: -2, 308: -2,          # Minor penalty for redirects
+    400: -8, 401: -8, 403: -8, 404: -8,                   # Moderate penalty for client errors
+    500: -12, 501: -12, 502: -12, 503: -12, 504: -12,     # Server error penalty
+    0: -15                                                # Major penalty for connection issues
+}
+DEFAULT_STATUS_DELTA = -10
+
+@lru_cache(maxsize=8192)
+def trust_score(threat_level: int, confidence: int, status_code: int, ssl_error: bool,
+                timeout: bool, connection_error: bool, https: bool, content_bucket: int) -> int:
+    """Composite trust score from the scan signals (pure, so memoized by signal tuple)"""
+    base_score = 85  # Start with neutral-positive baseline
+    
+    # AI threat level impact (primary factor)
+    base_score -= (threat_level - 1) * 8
+    
+    # HTTP status code impact
+    base_score += STATUS_SCORE_DELTAS.get(status_code, DEFAULT_STATUS_DELTA)
+    
+    # Security-specific penalties
+    if ssl_error:
+        base_score -= 20  # Major penalty for SSL issues
+    elif timeout:
+        base_score -= 5   # Minor penalty for slow response
+    elif connection_error:
+        base_score -= 15  # Moderate penalty for connection issues
+    
+    # AI confidence impact
+    if confidence >= 95:
+        base_score += 3   # Bonus for high confidence
+    elif confidence >= 90:
+        base_score += 1   # Small bonus
+    elif confidence < 80:
+        base_score -= 5   # Penalty for low confidence
+    
+    # Content quality indicators
+    if content_bucket > 0:
+        base_score += 2  # Bonus for substantial content
+    elif content_bucket < 0:
+        base_score -= 3  # Penalty for minimal content
+    
+    # HTTPS bonus
+    if https:
+        base_score += 3  # Bonus for HTTPS
+    
+    # Ensure score stays within valid bounds
+    return max(0, min(100, base_score))
+
+# Verdict fields that must be lists of strings
+AI_LIST_FIELDS = ("recommendations", "categories", "risk_factors")
+
+# Fields every AI verdict must carry, with the value used when one is missing;
+# list defaults are stored as tuples and copied into fresh lists on use
+AI_RESPONSE_DEFAULTS = {
+    "threat_level": 5,
+    "confidence": 85,
+    "insights": "Security analysis completed successfully.",
+    "recommendations": ("Regular monitoring recommended",),
+    "categories": ("Web Content",),
+    "risk_factors": ("Standard web content",)
+}
+
+@dataclass(slots=True)
+class ScanResult:
+    """Public result of one URL analysis"""
+    url: str
+    trust_score: int
+    threat_level: int
+    ai_confidence: int
+    ai_insights: str
+    recommendations: List[str]
+    scan_time: int
+    status_code: int
+    categories: List[str]
+    risk_factors: List[str]
+    ai_provider: str
+    enhanced_mode: bool = True
+    version: str = "3.1.0"
+    scan_type: str = "ai_enhanced"
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Shallow dict view; the lists are freshly built per scan, so unlike asdict() nothing is deep-copied"""
+        return {name: getattr(self, name) for name in SCAN_RESULT_FIELDS}
+
+SCAN_RESULT_FIELDS = tuple(field.name for field in fields(ScanResult))
+
+# Prompts are built once; only the per-scan fields are filled in with str.format
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a professional cybersecurity analyst. Always respond with valid JSON only."
+}
+
+ANALYSIS_PROMPT = """Analyze this website for security threats and provide a professional assessment.
+
+URL: {url}
+Domain: {domain}
+HTTP Status: {status_code}
+Content Sample: {sample}
+
+Analyze for: malware indicators, phishing patterns, suspicious content, domain reputation, SSL security.
+
+Respond with ONLY valid JSON:
+{{
+  "threat_level": 1-10,
+  "confidence": 75-99,
+  "insights": "Professional security assessment (max 120 characters)",
+  "recommendations": ["actionable recommendation 1", "actionable recommendation 2"],
+  "categories": ["primary category", "secondary category"],
+  "risk_factors": ["specific risk factor 1", "specific risk factor 2"]
+}}
+
+Be accurate and professional. Use lower threat_level (1-3) for legitimate sites."""
+
+BATCH_ANALYSIS_PROMPT = """Analyze each of these websites for security threats and provide a professional assessment.
+
+{listing}
+
+Analyze for: malware indicators, phishing patterns, suspicious content, domain reputation, SSL security.
+
+Respond with ONLY valid JSON, one entry per website in the same order:
+{{
+  "results": [
+    {{
+      "threat_level": 1-10,
+      "confidence": 75-99,
+      "insights": "Professional security assessment (max 120 characters)",
+      "recommendations": ["actionable recommendation 1", "actionable recommendation 2"],
+      "categories": ["primary category", "secondary category"],
+      "risk_factors": ["specific risk factor 1", "specific risk factor 2"]
+    }}
+  ]
+}}
+
+Be accurate and professional. Use lower threat_level (1-3) for legitimate sites."""
+
+# Top-level verdict fields that can be read out of a still-streaming JSON object
+PARTIAL_VERDICT_PATTERNS = {
+    "threat_level": re.compile(r'"threat_level"\s*:\s*(\d+)\s*[,}]'),
+    "ai_confidence": re.compile(r'"confidence"\s*:\s*(\d+)\s*[,}]'),
+    "ai_insights": re.compile(r'"insights"\s*:\s*("(?:[^"\\]|\\.)*")')
+}
+
+def _partial_verdict(text: str) -> Dict[str, Any]:
+    """Fields already complete in a partial JSON completion"""
+    partial = {}
+    for field, pattern in PARTIAL_VERDICT_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            partial[field] = orjson.loads(match.group(1))
+    return partial
+
+# Fetch results by normalized URL and AI verdicts by content hash. Module-level
+# so they survive the per-request analyzer instances created in main.py.
+_fetch_cache: Dict[str, Dict] = {}
+_analysis_cache: Dict[str, Dict] = {}
+MAX_ANALYZER_CACHE_SIZE = 4096
+
+def _get_cached(cache: Dict, key: str) -> Optional[Dict]:
+    """Get a cached entry (fresh copy) if still within settings.CACHE_TTL, marking it recently used"""
+    cached = cache.pop(key, None)
+    if cached is None or time.time() - cached["timestamp"] > settings.CACHE_TTL:
+        return None
+    
+    cache[key] = cached
+    return orjson.loads(cached["data"])
+
+def _cache_result(cache: Dict, key: str, data: Dict):
+    """Cache an entry as serialized JSON with timestamp"""
+    
+    # Bounded LRU: the dict keeps least recently used entries first
+    cache.pop(key, None)
+    if len(cache) >= MAX_ANALYZER_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    
+    cache[key] = {
+        "data": orjson.dumps(data),
+        "timestamp": time.time()
+    }
+
+@lru_cache(maxsize=1024)
+def _parse_url(url: str):
+    """urlparse memoized, since validation, cache keys and prompts all parse the same URL"""
+    return urlparse(url)
+
+def _normalize_url(url: str) -> str:
+    """Cache key form of a URL: lowercase scheme and host, no fragment"""
+    parts = _parse_url(url)
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.params, parts.query, ''))
+
+def _verdict_key(url: str, content_data: Dict) -> str:
+    """Compact key of what the AI verdict depends on (URL + status code + content sample)"""
+    digest = hashlib.blake2b(_normalize_url(url).encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(content_data.get("content", "").encode('utf-8', errors='replace'))
+    return f"{content_data.get('status_code', 0)}:{digest.hexdigest()}"
+
+def _get_cached_verdict(url: str, content_data: Dict) -> Optional[Dict]:
+    """Cached AI verdict for this URL and content; failed fetches never hit the cache"""
+    if "error" in content_data:
+        return None
+    return _get_cached(_analysis_cache, _verdict_key(url, content_data))
+
+def _cache_verdict(url: str, content_data: Dict, ai_analysis: Dict):
+    """Cache an AI verdict unless the fetch failed (those carry no page to judge)"""
+    if "error" not in content_data:
+        _cache_result(_analysis_cache, _verdict_key(url, content_data), ai_analysis)
+
 class AdvancedAIAnalyzer:
     """
     Enhanced AI Analyzer with multi-provider support and comprehensive fallback
     Supports Groq (primary), Anthropic, OpenAI with graceful degradation
     """
     
+    __slots__ = ("groq_api_key", "groq_client", "model", "max_tokens")
+    
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         if not self.groq_api_key:
@@ -24,192 +346,395 @@ class AdvancedAIAnalyzer:
             self.groq_client = None
         else:
             try:
-                from groq import Groq
-                self.groq_client = Groq(api_key=self.groq_api_key)
-                logger.info("✅ Groq AI client initialized successfully")
+                self.groq_client = _get_groq_client(self.groq_api_key)
             except ImportError:
                 logger.error("❌ Groq package not installed - run: pip install groq")
                 self.groq_client = None
             except Exception as e:
-                logger.error(f"❌ Groq initialization failed: {e}")
+                logger.error("❌ Groq initialization failed: %s", e)
                 self.groq_client = None
         
-        self.model = "mixtral-8x7b-32768"
+        self.model = settings.GROQ_MODEL
+        self.max_tokens = settings.GROQ_MAX_TOKENS
+    
+    @staticmethod
+    async def aclose():
+        """Close the shared HTTP session and Groq client (call on application shutdown)"""
+        global _http_session, _groq_client, _groq_client_key, _groq_warm
+        if _http_session is not None and not _http_session.closed:
+            await _http_session.close()
+        _http_session = None
+        if _groq_client is not None:
+            await _groq_client.close()
+        _groq_client = _groq_client_key = None
+        _groq_warm = False
         
-    async def analyze_url_advanced(self, url: str) -> Dict[str, Any]:
+    async def analyze_url_advanced(self, url: str) -> ScanResult:
         """
         Advanced AI-powered URL security analysis with comprehensive fallback
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Validate URL format
         if not self._is_valid_url(url):
             raise ValueError("Invalid URL format provided")
+        parsed = _parse_url(url)
         
-        # Fetch URL content safely
-        content_data = await self._safe_fetch_content(url)
+        # Fetch URL content safely (cached per normalized URL) while the Groq
+        # connection is opened in parallel
+        content_data = await self._fetch_and_warm(url)
         
         # Run AI security analysis
         try:
             if self.groq_client:
-                ai_analysis = await self._run_groq_analysis(url, content_data)
-                logger.info(f"✅ AI analysis completed for {url}")
+                ai_analysis = await self._analyze_cached(url, content_data, parsed.netloc)
+                logger.info("✅ AI analysis completed for %s", url)
             else:
                 ai_analysis = self._fallback_analysis()
-                logger.info(f"⚠️ Using fallback analysis for {url}")
+                logger.info("⚠️ Using fallback analysis for %s", url)
         except Exception as e:
-            logger.error(f"❌ AI analysis failed for {url}: {e}")
+            logger.error("❌ AI analysis failed for %s: %s", url, e)
             ai_analysis = self._fallback_analysis()
         
+        return self._build_result(url, ai_analysis, content_data, start_ns)
+    
+    async def analyze_url_advanced_stream(self, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of analyze_url_advanced: yields partial dicts ("partial": True)
+        as the fetch and AI verdict arrive, then the complete result last
+        """
+        start_ns = time.perf_counter_ns()
+        
+        if not self._is_valid_url(url):
+            raise ValueError("Invalid URL format provided")
+        domain = _parse_url(url).netloc
+        
+        content_data = await self._fetch_and_warm(url)
+        yield {"url": url, "status_code": content_data.get("status_code", 0), "partial": True}
+        
+        ai_analysis = None
+        if self.groq_client:
+            ai_analysis = _get_cached_verdict(url, content_data)
+            if ai_analysis is None:
+                try:
+                    prompt = self._build_analysis_prompt(url, content_data, domain)
+                    last_partial = {}
+                    async with aclosing(self._stream_groq_completion(prompt, self.max_tokens)) as stream:
+                        async for text in stream:
+                            ai_analysis = self._parse_streamed_verdict(text)
+                            if ai_analysis is not None:
+                                break
+                            partial = _partial_verdict(text)
+                            if partial != last_partial:
+                                last_partial = partial
+                                yield {"url": url, **partial, "partial": True}
+                    if ai_analysis is not None:
+                        _cache_verdict(url, content_data, ai_analysis)
+                except Exception as e:
+                    logger.error("❌ Streaming AI analysis failed for %s: %s", url, e)
+        
+        yield self._build_result(url, ai_analysis or self._fallback_analysis(), content_data, start_ns).as_dict()
+    
+    async def analyze_urls_batch(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze several URLs with one Groq completion instead of one call per URL
+        """
+        start_ns = time.perf_counter_ns()
+        
+        valid_urls = [url for url in urls if self._is_valid_url(url)]
+        contents, _ = await asyncio.gather(
+            asyncio.gather(*[self._fetch_cached(url) for url in valid_urls]),
+            self._ensure_groq_warm()
+        )
+        content_by_url = dict(zip(valid_urls, contents))
+        
+        # Reuse cached verdicts; only the remaining URLs go into the batch prompt
+        analyses = {}
+        pending = []
+        if self.groq_client:
+            for url, content_data in content_by_url.items():
+                cached = _get_cached_verdict(url, content_data)
+                if cached is not None:
+                    analyses[url] = cached
+                else:
+                    pending.append(url)
+        
+        if pending:
+            try:
+                batch = await self._run_groq_batch_analysis([(url, content_by_url[url]) for url in pending])
+                for url, ai_analysis in zip(pending, batch):
+                    _cache_verdict(url, content_by_url[url], ai_analysis)
+                    analyses[url] = ai_analysis
+                logger.info("✅ Batch AI analysis completed for %d URLs", len(pending))
+            except Exception as e:
+                # Fall back to the per-URL path, which has its own fallback analysis
+                logger.error("❌ Batch AI analysis failed, analyzing individually: %s", e)
+                for url in pending:
+                    try:
+                        analyses[url] = await self._analyze_cached(url, content_by_url[url], _parse_url(url).netloc)
+                    except Exception as url_error:
+                        logger.error("❌ AI analysis failed for %s: %s", url, url_error)
+        
+        results = []
+        for url in urls:
+            if url not in content_by_url:
+                results.append({"url": url, "error": "Invalid URL format provided"})
+                continue
+            ai_analysis = analyses.get(url) or self._fallback_analysis()
+            results.append(self._build_result(url, ai_analysis, content_by_url[url], start_ns).as_dict())
+        return results
+    
+    def _build_result(self, url: str, ai_analysis: Dict, content_data: Dict, start_ns: int) -> ScanResult:
+        """Assemble the public scan result from the AI verdict and fetch data"""
         # Calculate composite trust score
         trust_score = self._calculate_trust_score(ai_analysis, content_data)
-        scan_time = int((time.time() - start_time) * 1000)
-        
-        result = {
-            "url": url,
-            "trust_score": trust_score,
-            "threat_level": ai_analysis.get("threat_level", 3),
-            "ai_confidence": ai_analysis.get("confidence", 85),
-            "ai_insights": ai_analysis.get("insights", "Security analysis completed using advanced algorithms."),
-            "recommendations": ai_analysis.get("recommendations", ["Regular monitoring recommended", "Verify SSL certificate status"]),
-            "scan_time": scan_time,
-            "status_code": content_data.get("status_code", 0),
-            "categories": ai_analysis.get("categories", ["Web Content"]),
-            "risk_factors": ai_analysis.get("risk_factors", ["Analysis completed successfully"]),
-            "ai_provider": "groq" if self.groq_client else "fallback",
-            "enhanced_mode": True,
-            "version": "3.1.0"
-        }
+        scan_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+        
+        result = ScanResult(
+            url=url,
+            trust_score=trust_score,
+            threat_level=ai_analysis.get("threat_level", 3),
+            ai_confidence=ai_analysis.get("confidence", 85),
+            ai_insights=ai_analysis.get("insights", "Security analysis completed using advanced algorithms."),
+            recommendations=ai_analysis.get("recommendations", ["Regular monitoring recommended", "Verify SSL certificate status"]),
+            scan_time=scan_time,
+            status_code=content_data.get("status_code", 0),
+            categories=ai_analysis.get("categories", ["Web Content"]),
+            risk_factors=ai_analysis.get("risk_factors", ["Analysis completed successfully"]),
+            ai_provider="groq" if self.groq_client else "fallback"
+        )
         
-        logger.info(f"📊 Scan completed: Trust Score {trust_score}% in {scan_time}ms")
+        logger.info("📊 Scan completed: Trust Score %d%% in %dms", trust_score, scan_time)
         return result
     
     def _is_valid_url(self, url: str) -> bool:
         """Validate URL format"""
         try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
+            parsed = _parse_url(url)
         except Exception:
             return False
+        return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
+    
+    async def _fetch_and_warm(self, url: str) -> Dict[str, Any]:
+        """Fetch the page while warming the Groq connection, so neither waits on the other"""
+        content_data, _ = await asyncio.gather(self._fetch_cached(url), self._ensure_groq_warm())
+        return content_data
+    
+    async def _ensure_groq_warm(self):
+        """Open the shared Groq client's connection (DNS + TLS) once per process"""
+        global _groq_warm
+        if not self.groq_client or _groq_warm:
+            return
+        # Set before the call so concurrent scans don't each issue a warmup request
+        _groq_warm = True
+        try:
+            await self.groq_client.models.list()
+        except Exception as e:
+            # Warmup is best-effort; the completion call reports real failures
+            logger.debug("Groq warmup failed: %s", e)
+    
+    async def _fetch_cached(self, url: str) -> Dict[str, Any]:
+        """Fetch URL content, reusing a recent fetch of the same normalized URL"""
+        cache_key = _normalize_url(url)
+        cached = _get_cached(_fetch_cache, cache_key)
+        if cached is not None:
+            return cached
+        
+        content_data = await self._safe_fetch_content(url)
+        
+        # Failed fetches are not cached so transient errors are retried
+        if "error" not in content_data:
+            _cache_result(_fetch_cache, cache_key, content_data)
+        return content_data
+    
+    async def _analyze_cached(self, url: str, content_data: Dict, domain: str) -> Dict[str, Any]:
+        """Run the Groq analysis, reusing the verdict for the same URL and content"""
+        cached = _get_cached_verdict(url, content_data)
+        if cached is not None:
+            logger.info("⚡ Reusing cached AI analysis for %s", url)
+            return cached
+        
+        ai_analysis = await self._run_groq_analysis(url, content_data, domain)
+        _cache_verdict(url, content_data, ai_analysis)
+        return ai_analysis
     
     async def _safe_fetch_content(self, url: str) -> Dict[str, Any]:
         """Safely fetch URL content with comprehensive error handling"""
+        host = _parse_url(url).netloc
+        breaker = _get_breaker(host)
+        if breaker.is_open(time.time()):
+            logger.warning("🚫 Circuit open for %s, skipping fetch", host)
+            return {"status_code": 503, "content": "", "error": "Circuit open", "connection_error": True}
+        
         try:
-            headers = {
-                'User-Agent': 'ViralSafe-Enhanced-Scanner/3.1 (Security-Analysis)',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'no-cache'
-            }
-            
-            # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                lambda: requests.get(url, headers=headers, timeout=8, allow_redirects=True, verify=True)
-            )
-            
-            return {
-                "status_code": response.status_code,
-                "content": response.text[:2000],  # First 2KB for analysis
-                "headers": dict(response.headers),
-                "final_url": response.url,
-                "redirected": response.url != url,
-                "content_length": len(response.text),
-                "encoding": response.encoding or 'utf-8'
-            }
-            
-        except requests.exceptions.Timeout:
-            logger.warning(f"⏰ Request timeout for {url}")
+            content_data = await self._fetch_with_retry(url)
+        except asyncio.TimeoutError:
+            logger.warning("⏰ Request timeout for %s", url)
+            breaker.record_failure(time.time())
             return {"status_code": 408, "content": "", "error": "Request timeout", "timeout": True}
-        except requests.exceptions.SSLError as e:
-            logger.warning(f"🔒 SSL error for {url}: {e}")
+        except aiohttp.ClientSSLError as e:
+            logger.warning("🔒 SSL error for %s: %s", url, e)
             return {"status_code": 495, "content": "", "error": "SSL certificate error", "ssl_error": True}
-        except requests.exceptions.ConnectionError:
-            logger.warning(f"🌐 Connection error for {url}")
+        except aiohttp.ClientConnectionError:
+            logger.warning("🌐 Connection error for %s", url)
+            breaker.record_failure(time.time())
             return {"status_code": 0, "content": "", "error": "Connection failed", "connection_error": True}
         except Exception as e:
-            logger.error(f"❌ Fetch error for {url}: {e}")
+            logger.error("❌ Fetch error for %s: %s", url, e)
             return {"status_code": 0, "content": "", "error": str(e)}
+        
+        if content_data["status_code"] >= 500:
+            breaker.record_failure(time.time())
+        else:
+            _breakers.pop(host, None)
+        return content_data
+    
+    async def _fetch_with_retry(self, url: str) -> Dict[str, Any]:
+        """Fetch once, retrying dropped connections, timeouts and gateway errors with backoff"""
+        for attempt in range(FETCH_MAX_ATTEMPTS):
+            last_attempt = attempt == FETCH_MAX_ATTEMPTS - 1
+            try:
+                content_data = await self._fetch_once(url)
+                if last_attempt or content_data["status_code"] not in RETRYABLE_STATUS_CODES:
+                    return content_data
+            except RETRYABLE_FETCH_ERRORS:
+                if last_attempt:
+                    raise
+            await asyncio.sleep(min(FETCH_BACKOFF_BASE * 2 ** attempt, FETCH_BACKOFF_MAX))
+    
+    async def _fetch_once(self, url: str, headers: Dict[str, str] = HEADERS) -> Dict[str, Any]:
+        """Single GET of the page head"""
+        async with _get_http_session().get(url, headers=headers, allow_redirects=True) as response:
+            range_rejected = response.status == 416 and 'Range' in headers
+            if not range_rejected:
+                # Only the head of the page is analyzed, so read a bounded chunk
+                # instead of downloading and decoding the whole body
+                chunk = await response.content.read(FETCH_READ_BYTES)
+                encoding = response.charset or 'utf-8'
+                final_url = str(response.url)
+                
+                return {
+                    # A 206 is the requested head of a 200 page; scoring, the prompt
+                    # and the API see the status a plain GET would return
+                    "status_code": 200 if response.status == 206 else response.status,
+                    "content": chunk.decode(encoding, errors='replace')[:2000],  # First 2KB for analysis
+                    "headers": dict(response.headers),
+                    "final_url": final_url,
+                    "redirected": final_url != url,
+                    "content_length": self._content_length(response, chunk),
+                    "encoding": encoding
+                }
+        
+        # The server rejected the range; fetch once more without it and report what that returns
+        return await self._fetch_once(url, PLAIN_HEADERS)
+    
+    def _content_length(self, response: aiohttp.ClientResponse, chunk: bytes) -> int:
+        """Full body size from Content-Range/Content-Length, or the bytes actually read"""
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rpartition('/')[2]
+        if total.isdigit():
+            return int(total)
+        
+        content_length = response.headers.get('Content-Length', '')
+        if response.status != 206 and content_length.isdigit():
+            return int(content_length)
+        return len(chunk)
     
-    async def _run_groq_analysis(self, url: str, content_data: Dict) -> Dict[str, Any]:
+    def _build_analysis_prompt(self, url: str, content_data: Dict, domain: str) -> str:
+        """Enhanced security analysis prompt for a single URL"""
+        return ANALYSIS_PROMPT.format(
+            url=url,
+            domain=domain,
+            status_code=content_data.get("status_code", 0),
+            sample=content_data.get("content", "")[:1000]
+        )
+    
+    async def _stream_groq_completion(self, prompt: str, max_tokens: int):
+        """Stream a JSON-mode Groq completion, yielding the accumulated text after each chunk"""
+        stream = await self.groq_client.chat.completions.create(
+            messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            model=self.model,
+            temperature=0.1,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        
+        text = ""
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    text += delta
+                    yield text
+        finally:
+            # Release the HTTP response when the caller stops reading early
+            await stream.response.aclose()
+    
+    def _parse_streamed_verdict(self, text: str) -> Optional[Dict]:
+        """Validated verdict once the streamed text forms a complete JSON object"""
+        # Only a buffer ending in '}' can be complete; skip parsing otherwise
+        if not text.rstrip().endswith("}"):
+            return None
+        try:
+            return self._validate_ai_response(orjson.loads(text))
+        except orjson.JSONDecodeError:
+            return None
+    
+    async def _run_groq_analysis(self, url: str, content_data: Dict, domain: str) -> Dict[str, Any]:
         """Run AI analysis using Groq API with enhanced prompting"""
         
-        domain = urlparse(url).netloc
-        content = content_data.get("content", "")
-        status_code = content_data.get("status_code", 0)
+        prompt = self._build_analysis_prompt(url, content_data, domain)
         
-        # Enhanced security analysis prompt
-        prompt = f"""Analyze this website for security threats and provide a professional assessment.
-
-URL: {url}
-Domain: {domain}
-HTTP Status: {status_code}
-Content Sample: {content[:1000]}
-
-Analyze for: malware indicators, phishing patterns, suspicious content, domain reputation, SSL security.
-
-Respond with ONLY valid JSON:
-{{
-  "threat_level": 1-10,
-  "confidence": 75-99,
-  "insights": "Professional security assessment (max 120 characters)",
-  "recommendations": ["actionable recommendation 1", "actionable recommendation 2"],
-  "categories": ["primary category", "secondary category"],
-  "risk_factors": ["specific risk factor 1", "specific risk factor 2"]
-}}
-
-Be accurate and professional. Use lower threat_level (1-3) for legitimate sites."""
-
         try:
-            # Make API call to Groq
-            response = await self.groq_client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a professional cybersecurity analyst. Always respond with valid JSON only."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                temperature=0.1,
-                max_tokens=500
-            )
+            # Stream the completion and return as soon as the JSON object is complete
+            async with aclosing(self._stream_groq_completion(prompt, self.max_tokens)) as stream:
+                async for text in stream:
+                    result = self._parse_streamed_verdict(text)
+                    if result is not None:
+                        return result
             
-            # Extract and clean response
-            content = response.choices.message.content.strip()
+            raise ValueError("Groq stream ended before a complete JSON object")
             
-            # Remove any markdown formatting
-            if content.startswith("```json"):
-                content = content[7:]
-            elif content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Parse JSON response
-            result = json.loads(content)
-            
-            # Validate and sanitize result
-            result = self._validate_ai_response(result)
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON decode error in Groq response: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("❌ JSON decode error in Groq response: %s", e)
             raise Exception("Failed to parse AI analysis response")
         except Exception as e:
-            logger.error(f"❌ Groq API error: {e}")
+            logger.error("❌ Groq API error: %s", e)
             raise Exception(f"AI analysis service error: {str(e)}")
     
+    async def _run_groq_batch_analysis(self, entries: List[Tuple[str, Dict]]) -> List[Dict[str, Any]]:
+        """Analyze several fetched URLs in a single Groq completion"""
+        
+        listing = "\n".join(
+            f"[{i}] URL={url} STATUS={content_data.get('status_code', 0)} "
+            f"SAMPLE={content_data.get('content', '')[:500]!r}"
+            for i, (url, content_data) in enumerate(entries)
+        )
+        
+        prompt = BATCH_ANALYSIS_PROMPT.format(listing=listing)
+
+        response = await self.groq_client.chat.completions.create(
+            messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            model=self.model,
+            temperature=0.1,
+            max_tokens=self.max_tokens * len(entries),
+            response_format={"type": "json_object"}
+        )
+        
+        content = response.choices[0].message.content
+        
+        results = orjson.loads(content).get("results")
+        if not isinstance(results, list) or len(results) != len(entries):
+            raise ValueError("Batch AI response does not match the requested URLs")
+        
+        return [self._validate_ai_response(result if isinstance(result, dict) else {}) for result in results]
+    
     def _validate_ai_response(self, result: Dict) -> Dict:
         """Validate and sanitize AI response"""
         # Ensure required fields exist
-        required_fields = ["threat_level", "confidence", "insights", "recommendations", "categories", "risk_factors"]
-        for field in required_fields:
-            if field not in result:
-                result[field] = self._get_default_value(field)
+        for field, default in AI_RESPONSE_DEFAULTS.items():
+            result.setdefault(field, list(default) if isinstance(default, tuple) else default)
         
         # Validate data types and ranges
         if not isinstance(result["threat_level"], int) or not 1 <= result["threat_level"] <= 10:
@@ -223,24 +748,12 @@ Be accurate and professional. Use lower threat_level (1-3) for legitimate sites.
             result["insights"] = "Security analysis completed successfully."
         
         # Ensure list fields are lists
-        for field in ["recommendations", "categories", "risk_factors"]:
+        for field in AI_LIST_FIELDS:
             if not isinstance(result[field], list):
                 result[field] = [str(result[field])] if result[field] else ["Not specified"]
         
         return result
     
-    def _get_default_value(self, field: str):
-        """Get default values for missing fields"""
-        defaults = {
-            "threat_level": 5,
-            "confidence": 85,
-            "insights": "Security analysis completed successfully.",
-            "recommendations": ["Regular monitoring recommended"],
-            "categories": ["Web Content"],
-            "risk_factors": ["Standard web content"]
-        }
-        return defaults.get(field, "Unknown")
-    
     def _fallback_analysis(self) -> Dict[str, Any]:
         """Enhanced fallback analysis when AI is unavailable"""
         return {
@@ -261,61 +774,25 @@ Be accurate and professional. Use lower threat_level (1-3) for legitimate sites.
     
     def _calculate_trust_score(self, ai_analysis: Dict, content_data: Dict) -> int:
         """Calculate composite trust score from multiple factors"""
-        base_score = 85  # Start with neutral-positive baseline
-        
-        # AI threat level impact (primary factor)
-        threat_level = ai_analysis.get("threat_level", 5)
-        threat_penalty = (threat_level - 1) * 8
-        base_score -= threat_penalty
-        
-        # HTTP status code impact
-        status_code = content_data.get("status_code", 0)
-        if status_code == 200:
-            base_score += 5  # Bonus for successful response
-        elif status_code in [301, 302, 303, 307, 308]:
-            base_score -= 2  # Minor penalty for redirects
-        elif status_code in [400, 401, 403, 404]:
-            base_score -= 8  # Moderate penalty for client errors
-        elif status_code in [500, 501, 502, 503, 504]:
-            base_score -= 12  # Server error penalty
-        elif status_code == 0:
-            base_score -= 15  # Major penalty for connection issues
+        # Content quality bucket: -1 minimal (<100 chars), 1 substantial (>500), 0 otherwise
+        content_length = len(content_data.get("content") or "")
+        if content_length > 500:
+            content_bucket = 1
+        elif 0 < content_length < 100:
+            content_bucket = -1
         else:
-            base_score -= 10  # General penalty for other errors
-        
-        # Security-specific penalties
-        if content_data.get("ssl_error"):
-            base_score -= 20  # Major penalty for SSL issues
-        elif content_data.get("timeout"):
-            base_score -= 5   # Minor penalty for slow response
-        elif content_data.get("connection_error"):
-            base_score -= 15  # Moderate penalty for connection issues
-        
-        # AI confidence impact
-        confidence = ai_analysis.get("confidence", 85)
-        if confidence >= 95:
-            base_score += 3   # Bonus for high confidence
-        elif confidence >= 90:
-            base_score += 1   # Small bonus
-        elif confidence < 80:
-            base_score -= 5   # Penalty for low confidence
-        
-        # Content quality indicators
-        if content_data.get("content"):
-            content_length = len(content_data.get("content", ""))
-            if content_length > 500:
-                base_score += 2  # Bonus for substantial content
-            elif content_length < 100:
-                base_score -= 3  # Penalty for minimal content
-        
-        # HTTPS bonus
-        if content_data.get("final_url", "").startswith("https://"):
-            base_score += 3  # Bonus for HTTPS
-        
-        # Ensure score stays within valid bounds
-        final_score = max(0, min(100, base_score))
-        
-        return final_score
+            content_bucket = 0
+        
+        return trust_score(
+            ai_analysis.get("threat_level", 5),
+            ai_analysis.get("confidence", 85),
+            content_data.get("status_code", 0),
+            bool(content_data.get("ssl_error")),
+            bool(content_data.get("timeout")),
+            bool(content_data.get("connection_error")),
+            content_data.get("final_url", "").startswith("https://"),
+            content_bucket
+        )
 
 # Test function for development
 async def test_analyzer():
@@ -325,16 +802,22 @@ async def test_analyzer():
         test_urls = ["https://google.com", "https://github.com"]
         
         for url in test_urls:
-            logger.info(f"🧪 Testing analysis for {url}")
+            logger.info("🧪 Testing analysis for %s", url)
             result = await analyzer.analyze_url_advanced(url)
             print(f"✅ Results for {url}:")
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
             print("-" * 50)
         
         return True
     except Exception as e:
-        logger.error(f"❌ Test failed: {e}")
+        logger.error("❌ Test failed: %s", e)
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(test_analyzer())
\ No newline at end of file
@@ -1,86 +1,198 @@
-import os
-from typing import Optional, Dict, Any
+from typing import ClassVar, Optional, Dict, Any, Mapping, Tuple
+from functools import lru_cache
+from types import MappingProxyType
 import logging
+from pydantic import PrivateAttr, computed_field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = logging.getLogger(__name__)
 
-class Settings:
+__all__ = ["Settings", "get_settings", "log_configuration_summary", "settings"]
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a config payload: dicts become proxies and lists tuples, at every level"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class Settings(BaseSettings):
     """
     Enhanced configuration management for ViralSafe v3.1
     Handles all environment variables with validation and defaults
     """
     
-    def __init__(self):
-        # Core API Settings
-        self.API_TITLE = "ViralSafe Platform Enhanced API"
-        self.API_VERSION = "3.1.0"
-        self.ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
-        self.PORT = int(os.getenv("PORT", 10000))
-        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-        
-        # AI Provider Settings (NEW in v3.1)
-        self.GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-        self.ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-        self.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-        
-        # Database Settings
-        self.MONGODB_URI = os.getenv("MONGODB_URI")
-        self.MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "viralsafe")
-        self.DATABASE_PING_TIMEOUT = int(os.getenv("DATABASE_PING_TIMEOUT", 5))
-        
-        # Security API Settings
-        self.VIRUSTOTAL_API_KEY = os.getenv("VIRUSTOTAL_API_KEY")
-        self.VIRUSTOTAL_BASE_URL = os.getenv("VIRUSTOTAL_BASE_URL", "https://www.virustotal.com/api/v3")
-        self.VIRUSTOTAL_RATE_LIMIT = int(os.getenv("VIRUSTOTAL_RATE_LIMIT", 4))
-        self.VIRUSTOTAL_TIMEOUT = int(os.getenv("VIRUSTOTAL_TIMEOUT", 30))
-        self.VIRUSTOTAL_MAX_RETRIES = int(os.getenv("VIRUSTOTAL_MAX_RETRIES", 3))
-        
-        # Security Configuration
-        self.HASH_SALT = os.getenv("HASH_SALT", "default_salt_change_in_production")
-        
-        # Performance Settings (Enhanced for v3.1)
-        self.MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 10000))
-        self.MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 10))
-        self.CACHE_TTL = int(os.getenv("CACHE_TTL", 3600))
-        self.REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 15))
-        self.HEALTH_CHECK_TIMEOUT = int(os.getenv("HEALTH_CHECK_TIMEOUT", 10))
-        
-        # Rate Limiting
-        self.RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", 100))
-        self.RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", 60))
-        
-        # CORS Settings
-        self.ALLOWED_ORIGINS = self._get_allowed_origins()
-        
-        # Feature Flags (Enhanced for v3.1)
-        self.database_configured = bool(self.MONGODB_URI)
-        self.virustotal_configured = bool(self.VIRUSTOTAL_API_KEY)
-        self.ai_configured = bool(self.GROQ_API_KEY)
-        self.multi_ai_enabled = bool(self.GROQ_API_KEY and (self.ANTHROPIC_API_KEY or self.OPENAI_API_KEY))
-        self.is_production = self.ENVIRONMENT.lower() == "production"
-        self.is_development = self.ENVIRONMENT.lower() == "development"
-        
+    # Values are read from the environment (or .env) and validated once;
+    # the instance is frozen so it can be shared without being mutated
+    model_config = SettingsConfigDict(frozen=True, env_file=".env", extra="ignore")
+    
+    # Core API Settings
+    API_TITLE: ClassVar[str] = "ViralSafe Platform Enhanced API"
+    API_VERSION: ClassVar[str] = "3.1.0"
+    
+    # CORS origins per environment, fixed at class definition
+    _ORIGINS_PROD: ClassVar[Tuple[str, ...]] = (
+        "https://viralsafe-platform-free.vercel.app",
+        "https://gzeu.github.io",
+        "https://viralsafe-platform-free-api.onrender.com"
+    )
+    _ORIGINS_DEV: ClassVar[Tuple[str, ...]] = _ORIGINS_PROD + (
+        "http://localhost:3000",
+        "http://localhost:3001",
+        "http://localhost:5173",
+        "http://127.0.0.1:3000"
+    )
+    ENVIRONMENT: str = "development"
+    PORT: int = 10000
+    LOG_LEVEL: str = "INFO"
+    
+    # AI Provider Settings (NEW in v3.1)
+    GROQ_API_KEY: Optional[str] = None
+    ANTHROPIC_API_KEY: Optional[str] = None
+    OPENAI_API_KEY: Optional[str] = None
+    GROQ_MODEL: str = "llama-3.1-8b-instant"
+    GROQ_MAX_TOKENS: int = 180
+    
+    # Database Settings
+    MONGODB_URI: Optional[str] = None
+    MONGODB_DB_NAME: str = "viralsafe"
+    DATABASE_PING_TIMEOUT: int = 5
+    
+    # Security API Settings
+    VIRUSTOTAL_API_KEY: Optional[str] = None
+    VIRUSTOTAL_BASE_URL: str = "https://www.virustotal.com/api/v3"
+    VIRUSTOTAL_RATE_LIMIT: int = 4
+    VIRUSTOTAL_TIMEOUT: int = 30
+    VIRUSTOTAL_MAX_RETRIES: int = 3
+    
+    # Security Configuration
+    HASH_SALT: str = "default_salt_change_in_production"
+    
+    # Performance Settings (Enhanced for v3.1)
+    MAX_CONTENT_LENGTH: int = 10000
+    MAX_BATCH_SIZE: int = 10
+    CACHE_TTL: int = 3600
+    REQUEST_TIMEOUT: int = 15
+    HEALTH_CHECK_TIMEOUT: int = 10
+    
+    # Rate Limiting
+    RATE_LIMIT_REQUESTS: int = 100
+    RATE_LIMIT_WINDOW: int = 60
+    
+    # Settings never change after load, so the config payloads are built once
+    # in model_post_init and handed out read-only all the way down
+    _environment: str = PrivateAttr()
+    _has_groq: bool = PrivateAttr()
+    _has_anthropic: bool = PrivateAttr()
+    _has_openai: bool = PrivateAttr()
+    _ai_provider_count: int = PrivateAttr()
+    _warnings: Tuple[str, ...] = PrivateAttr()
+    _validation: Mapping[str, Any] = PrivateAttr()
+    _database_config: Mapping[str, Any] = PrivateAttr()
+    _ai_config: Mapping[str, Any] = PrivateAttr()
+    _virustotal_config: Mapping[str, Any] = PrivateAttr()
+    _performance_config: Mapping[str, Any] = PrivateAttr()
+    _system_info: Mapping[str, Any] = PrivateAttr()
+    _feature_map: Mapping[str, bool] = PrivateAttr()
+    
+    def model_post_init(self, __context: Any) -> None:
+        self._environment = self.ENVIRONMENT.lower()
+        self._has_groq = bool(self.GROQ_API_KEY)
+        self._has_anthropic = bool(self.ANTHROPIC_API_KEY)
+        self._has_openai = bool(self.OPENAI_API_KEY)
+        self._ai_provider_count = self._has_groq + self._has_anthropic + self._has_openai
+        self._warnings = self._build_warnings()
+        self._validation = _freeze(self._build_validation())
+        self._database_config = _freeze(self._build_database_config())
+        self._ai_config = _freeze(self._build_ai_config())
+        self._virustotal_config = _freeze(self._build_virustotal_config())
+        self._performance_config = _freeze(self._build_performance_config())
+        self._system_info = _freeze(self._build_system_info())
+        self._feature_map = MappingProxyType({
+            "database": self.database_configured,
+            "ai_analysis": self.ai_configured,
+            "multi_ai": self.multi_ai_enabled,
+            "virustotal": self.virustotal_configured,
+            "advanced_scanning": True,
+            "threat_intelligence": self.ai_configured,
+            "real_time_monitoring": True,
+            "batch_processing": True,
+            "performance_optimization": True,
+            "analytics": self.database_configured
+        })
         logger.info(f"⚙️ ViralSafe v{self.API_VERSION} configuration loaded for {self.ENVIRONMENT} environment")
+    
+    # CORS Settings
+    @computed_field
+    @property
+    def ALLOWED_ORIGINS(self) -> Tuple[str, ...]:
+        return self._get_allowed_origins()
+    
+    # Feature Flags (Enhanced for v3.1)
+    @computed_field
+    @property
+    def database_configured(self) -> bool:
+        return bool(self.MONGODB_URI)
+    
+    @computed_field
+    @property
+    def virustotal_configured(self) -> bool:
+        return bool(self.VIRUSTOTAL_API_KEY)
+    
+    @computed_field
+    @property
+    def ai_configured(self) -> bool:
+        return self._has_groq
+    
+    @computed_field
+    @property
+    def multi_ai_enabled(self) -> bool:
+        return self._has_groq and (self._has_anthropic or self._has_openai)
+    
+    @computed_field
+    @property
+    def is_production(self) -> bool:
+        return self._environment == "production"
+    
+    @computed_field
+    @property
+    def is_development(self) -> bool:
+        return self._environment == "development"
         
-    def _get_allowed_origins(self) -> list:
+    def _get_allowed_origins(self) -> Tuple[str, ...]:
         """Get CORS allowed origins based on environment"""
-        base_origins = [
-            "https://viralsafe-platform-free.vercel.app",
-            "https://gzeu.github.io",
-            "https://viralsafe-platform-free-api.onrender.com"
-        ]
-        
-        if not self.is_production:
-            base_origins.extend([
-                "http://localhost:3000",
-                "http://localhost:3001", 
-                "http://localhost:5173",
-                "http://127.0.0.1:3000"
-            ])
-        
-        return base_origins
+        return self._ORIGINS_PROD if self.is_production else self._ORIGINS_DEV
     
-    def validate_configuration(self) -> Dict[str, Any]:
+    def validate_configuration(self) -> Mapping[str, Any]:
+        """Enhanced configuration validation for v3.1"""
+        return self._validation
+    
+    def get_database_config(self) -> Mapping[str, Any]:
+        """Get database configuration (sanitized)"""
+        return self._database_config
+    
+    def get_ai_config(self) -> Mapping[str, Any]:
+        """Get AI provider configuration (sanitized)"""
+        return self._ai_config
+    
+    def get_virustotal_config(self) -> Mapping[str, Any]:
+        """Get VirusTotal configuration (sanitized)"""
+        return self._virustotal_config
+    
+    def get_performance_config(self) -> Mapping[str, Any]:
+        """Get performance configuration"""
+        return self._performance_config
+    
+    def is_feature_enabled(self, feature: str) -> bool:
+        """Check if a specific feature is enabled"""
+        return self._feature_map.get(feature, False)
+    
+    def get_system_info(self) -> Mapping[str, Any]:
+        """Get comprehensive system information"""
+        return self._system_info
+    
+    def _build_validation(self) -> Dict[str, Any]:
         """Enhanced configuration validation for v3.1"""
         validation_result = {
             "service": "ViralSafe Enhanced API",
@@ -93,14 +205,10 @@ class Settings:
                 "virustotal": self.virustotal_configured
             },
             "ai_providers": {
-                "groq": bool(self.GROQ_API_KEY),
-                "anthropic": bool(self.ANTHROPIC_API_KEY),
-                "openai": bool(self.OPENAI_API_KEY),
-                "total_configured": sum([
-                    bool(self.GROQ_API_KEY),
-                    bool(self.ANTHROPIC_API_KEY), 
-                    bool(self.OPENAI_API_KEY)
-                ])
+                "groq": self._has_groq,
+                "anthropic": self._has_anthropic,
+                "openai": self._has_openai,
+                "total_configured": self._ai_provider_count
             },
             "features_enabled": {
                 "database_storage": self.database_configured,
@@ -112,11 +220,14 @@ class Settings:
                 "batch_processing": True,
                 "performance_optimization": True
             },
-            "warnings": [],
-            "fallback_mode": False
+            "warnings": self._warnings,
+            "fallback_mode": bool(self._warnings)
         }
         
-        # Add warnings for missing optional configurations
+        return validation_result
+    
+    def _build_warnings(self) -> Tuple[str, ...]:
+        """Warnings for missing optional configurations"""
         warnings = []
         if not self.database_configured:
             warnings.append("MongoDB not configured - analytics and storage disabled")
@@ -129,12 +240,9 @@ class Settings:
         if not self.multi_ai_enabled and self.ai_configured:
             warnings.append("Single AI provider configured - consider adding secondary providers for ensemble analysis")
         
-        validation_result["warnings"] = warnings
-        validation_result["fallback_mode"] = len(warnings) > 0
-        
-        return validation_result
+        return tuple(warnings)
     
-    def get_database_config(self) -> Dict[str, Any]:
+    def _build_database_config(self) -> Dict[str, Any]:
         """Get database configuration (sanitized)"""
         return {
             "uri_configured": bool(self.MONGODB_URI),
@@ -143,36 +251,33 @@ class Settings:
             "status": "configured" if self.database_configured else "not_configured"
         }
     
-    def get_ai_config(self) -> Dict[str, Any]:
+    def _build_ai_config(self) -> Dict[str, Any]:
         """Get AI provider configuration (sanitized)"""
         return {
             "providers": {
                 "groq": {
-                    "configured": bool(self.GROQ_API_KEY),
+                    "configured": self._has_groq,
                     "priority": 1,
-                    "status": "primary" if self.GROQ_API_KEY else "not_configured"
+                    "model": self.GROQ_MODEL,
+                    "status": "primary" if self._has_groq else "not_configured"
                 },
                 "anthropic": {
-                    "configured": bool(self.ANTHROPIC_API_KEY),
+                    "configured": self._has_anthropic,
                     "priority": 2,
-                    "status": "secondary" if self.ANTHROPIC_API_KEY else "not_configured"
+                    "status": "secondary" if self._has_anthropic else "not_configured"
                 },
                 "openai": {
-                    "configured": bool(self.OPENAI_API_KEY),
+                    "configured": self._has_openai,
                     "priority": 3,
-                    "status": "tertiary" if self.OPENAI_API_KEY else "not_configured"
+                    "status": "tertiary" if self._has_openai else "not_configured"
                 }
             },
             "ensemble_enabled": self.multi_ai_enabled,
             "fallback_enabled": True,
-            "total_providers": sum([
-                bool(self.GROQ_API_KEY),
-                bool(self.ANTHROPIC_API_KEY),
-                bool(self.OPENAI_API_KEY)
-            ])
+            "total_providers": self._ai_provider_count
         }
     
-    def get_virustotal_config(self) -> Dict[str, Any]:
+    def _build_virustotal_config(self) -> Dict[str, Any]:
         """Get VirusTotal configuration (sanitized)"""
         return {
             "api_key_configured": bool(self.VIRUSTOTAL_API_KEY),
@@ -183,7 +288,7 @@ class Settings:
             "status": "configured" if self.virustotal_configured else "not_configured"
         }
     
-    def get_performance_config(self) -> Dict[str, Any]:
+    def _build_performance_config(self) -> Dict[str, Any]:
         """Get performance configuration"""
         return {
             "max_content_length": self.MAX_CONTENT_LENGTH,
@@ -197,23 +302,7 @@ class Settings:
             }
         }
     
-    def is_feature_enabled(self, feature: str) -> bool:
-        """Check if a specific feature is enabled"""
-        feature_map = {
-            "database": self.database_configured,
-            "ai_analysis": self.ai_configured,
-            "multi_ai": self.multi_ai_enabled,
-            "virustotal": self.virustotal_configured,
-            "advanced_scanning": True,
-            "threat_intelligence": self.ai_configured,
-            "real_time_monitoring": True,
-            "batch_processing": True,
-            "performance_optimization": True,
-            "analytics": self.database_configured
-        }
-        return feature_map.get(feature, False)
-    
-    def get_system_info(self) -> Dict[str, Any]:
+    def _build_system_info(self) -> Dict[str, Any]:
         """Get comprehensive system information"""
         return {
             "service": self.API_TITLE,
@@ -233,24 +322,24 @@ class Settings:
                     True,  # real_time_monitoring always enabled
                     True   # batch_processing always enabled
                 ]),
-                "ai_providers": sum([
-                    bool(self.GROQ_API_KEY),
-                    bool(self.ANTHROPIC_API_KEY),
-                    bool(self.OPENAI_API_KEY)
-                ])
+                "ai_providers": self._ai_provider_count
             }
         }
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment only once"""
+    return Settings()
 
-# Enhanced validation on module load
-config_validation = settings.validate_configuration()
-if config_validation["warnings"]:
+def log_configuration_summary():
+    """Log configuration warnings and a feature summary; called once at app startup"""
+    config_validation = settings.validate_configuration()
     for warning in config_validation["warnings"]:
         logger.warning(f"⚠️ Config Warning: {warning}")
+    
+    logger.info(f"✅ ViralSafe v{settings.API_VERSION} configuration validated successfully")
+    logger.info(f"🎨 Features enabled: {sum(config_validation['features_enabled'].values())}/8")
+    logger.info(f"🤖 AI providers configured: {config_validation['ai_providers']['total_configured']}/3")
 
-# Log successful configuration
-logger.info(f"✅ ViralSafe v{settings.API_VERSION} configuration validated successfully")
-logger.info(f"🎨 Features enabled: {sum(config_validation['features_enabled'].values())}/8")
-logger.info(f"🤖 AI providers configured: {config_validation['ai_providers']['total_configured']}/3")
\ No newline at end of file
+# Global settings instance
+settings = get_settings()
\ No newline at end of file
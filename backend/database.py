@@ -1,20 +1,58 @@
 import asyncio
+import copy
 import logging
-from typing import Optional, Dict, List
+import time
+from collections import Counter
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, WriteConcern
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# (UTC day number, ISO date) of the last analytics write; the date string is
+# only rebuilt when the day rolls over
+_today_cache: Tuple[int, str] = (-1, "")
+
+# Motor client options, built once and reused on every (re)connect
+MONGO_CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 5000,  # 5 seconds timeout
+    "connectTimeoutMS": 10000,         # 10 seconds connect timeout
+    "maxPoolSize": 10,                 # Free tier limit
+    "minPoolSize": 1,
+    "retryWrites": True,
+    # Wire compression for the bandwidth-limited free tier; zlib is the
+    # built-in fallback when zstandard is not installed
+    "compressors": "zstd,zlib",
+    "zlibCompressionLevel": 6
+}
+
+# Fields left out when an analysis is read back; the ObjectId is internal to Mongo
+ANALYSIS_PROJECTION = {"_id": 0}
+
+def _utc_today() -> str:
+    """Current UTC date as YYYY-MM-DD, cached for the rest of the day"""
+    global _today_cache
+    day = int(time.time()) // 86400
+    if day != _today_cache[0]:
+        _today_cache = (day, datetime.utcfromtimestamp(day * 86400).date().isoformat())
+    return _today_cache[1]
+
 class DatabaseManager:
     """MongoDB Atlas database manager with connection pooling and error handling"""
     
+    __slots__ = ("client", "database", "analytics_unack", "connected", "_analytics_cache")
+    
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
         self.database: Optional[AsyncIOMotorDatabase] = None
+        # Analytics counters are best-effort, so their writes are not acknowledged
+        self.analytics_unack: Optional[AsyncIOMotorCollection] = None
         self.connected = False
+        # (monotonic time, payload) of the last 30-day aggregation; cleared on every store
+        self._analytics_cache: Optional[Tuple[float, dict]] = None
     
     async def connect(self) -> bool:
         """Initialize MongoDB Atlas connection"""
@@ -24,20 +62,14 @@ class DatabaseManager:
                 return False
             
             # Create client with connection options
-            self.client = AsyncIOMotorClient(
-                settings.MONGODB_URI,
-                serverSelectionTimeoutMS=5000,  # 5 seconds timeout
-                connectTimeoutMS=10000,         # 10 seconds connect timeout
-                maxPoolSize=10,                 # Free tier limit
-                minPoolSize=1,
-                retryWrites=True
-            )
+            self.client = AsyncIOMotorClient(settings.MONGODB_URI, **MONGO_CLIENT_OPTIONS)
             
             # Test connection
             await self.client.admin.command('ping')
             
             # Get database
             self.database = self.client[settings.MONGODB_DB_NAME]
+            self.analytics_unack = self.database.analytics.with_options(write_concern=WriteConcern(w=0))
             
             # Create indexes for better performance
             await self.create_indexes()
@@ -65,16 +97,23 @@ class DatabaseManager:
     async def create_indexes(self):
         """Create database indexes for optimal performance"""
         try:
-            # Analyses collection indexes
-            analyses = self.database.analyses
-            await analyses.create_index("content_hash", unique=True)
-            await analyses.create_index("timestamp")
-            await analyses.create_index("risk_level")
-            await analyses.create_index("platform")
+            # Analyses collection indexes, created in one round trip
+            await self.database.analyses.create_indexes([
+                IndexModel([("content_hash", ASCENDING)], unique=True),
+                # get_analysis looks documents up by id; sparse so id-less documents don't collide
+                IndexModel([("id", ASCENDING)], unique=True, sparse=True, name="id_unique"),
+                # Covers get_analytics: range on timestamp, reads only risk_level/risk_score.
+                # Its timestamp prefix also serves plain timestamp queries.
+                IndexModel(
+                    [("timestamp", DESCENDING), ("risk_level", ASCENDING), ("risk_score", ASCENDING)],
+                    name="analytics_rollup"
+                ),
+                IndexModel([("risk_level", ASCENDING)]),
+                IndexModel([("platform", ASCENDING)])
+            ])
             
             # User analytics collection indexes
-            analytics = self.database.analytics
-            await analytics.create_index("date", unique=True)
+            await self.database.analytics.create_index("date", unique=True)
             
             logger.info("Database indexes created successfully")
             
@@ -88,9 +127,9 @@ class DatabaseManager:
                 return {"status": "disconnected", "error": "No active connection"}
             
             # Test with a simple ping
-            start_time = asyncio.get_event_loop().time()
+            start_time = time.perf_counter()
             await self.client.admin.command('ping')
-            response_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             
             # Get collection stats
             stats = await self.get_collection_stats()
@@ -109,14 +148,15 @@ class DatabaseManager:
         """Get collection statistics"""
         try:
             collections = await self.database.list_collection_names()
-            stats = {}
             
-            for collection_name in collections:
-                collection = self.database[collection_name]
-                count = await collection.count_documents({})
-                stats[collection_name] = count
+            # Counts come from collection metadata instead of a full scan, and
+            # all collections are queried at once rather than one after another
+            counts = await asyncio.gather(*[
+                self.database[collection_name].estimated_document_count()
+                for collection_name in collections
+            ])
             
-            return stats
+            return dict(zip(collections, counts))
         except Exception:
             return {}
     
@@ -126,14 +166,16 @@ class DatabaseManager:
             if not self.connected:
                 return False
             
-            # Add storage timestamp
-            analysis_data['stored_at'] = datetime.utcnow()
+            # Add storage timestamp; the same instant dates the analytics update
+            now = datetime.utcnow()
+            analysis_data['stored_at'] = now
             
-            # Store in analyses collection
-            result = await self.database.analyses.insert_one(analysis_data)
-            
-            # Update daily analytics
-            await self.update_daily_analytics(analysis_data)
+            # Store in analyses collection and update daily analytics concurrently;
+            # they live in different collections, so one bulk_write cannot cover both
+            result, _ = await asyncio.gather(
+                self.database.analyses.insert_one(analysis_data),
+                self.update_daily_analytics(analysis_data, now)
+            )
             
             return bool(result.inserted_id)
             
@@ -147,7 +189,7 @@ class DatabaseManager:
             if not self.connected:
                 return None
             
-            result = await self.database.analyses.find_one({"id": analysis_id})
+            result = await self.database.analyses.find_one({"id": analysis_id}, ANALYSIS_PROJECTION)
             return result
             
         except Exception as e:
@@ -160,42 +202,41 @@ class DatabaseManager:
             if not self.connected:
                 return self.get_default_analytics()
             
+            if self._analytics_cache and time.monotonic() - self._analytics_cache[0] < settings.CACHE_TTL:
+                return copy.deepcopy(self._analytics_cache[1])
+            
             # Aggregate data from last 30 days
             since_date = datetime.utcnow() - timedelta(days=30)
             
+            # One bucket per risk level; the totals and average are folded client-side
             pipeline = [
                 {"$match": {"timestamp": {"$gte": since_date}}},
                 {
                     "$group": {
-                        "_id": None,
-                        "total_analyses": {"$sum": 1},
-                        "avg_risk_score": {"$avg": "$risk_score"},
-                        "high_risk": {
-                            "$sum": {"$cond": [{"$eq": ["$risk_level", "high"]}, 1, 0]}
-                        },
-                        "medium_risk": {
-                            "$sum": {"$cond": [{"$eq": ["$risk_level", "medium"]}, 1, 0]}
-                        },
-                        "low_risk": {
-                            "$sum": {"$cond": [{"$eq": ["$risk_level", "low"]}, 1, 0]}
-                        }
+                        "_id": "$risk_level",
+                        "count": {"$sum": 1},
+                        "score_sum": {"$sum": "$risk_score"},
+                        "scored": {"$sum": {"$cond": [{"$isNumber": "$risk_score"}, 1, 0]}}
                     }
                 }
             ]
             
-            result = await self.database.analyses.aggregate(pipeline).to_list(1)
-            
-            if result:
-                data = result[0]
-                return {
-                    "total_analyses": data.get("total_analyses", 0),
-                    "avg_risk_score": round(data.get("avg_risk_score", 0), 3),
-                    "risk_distribution": {
-                        "high": data.get("high_risk", 0),
-                        "medium": data.get("medium_risk", 0),
-                        "low": data.get("low_risk", 0)
-                    }
+            groups = await self.database.analyses.aggregate(pipeline).to_list(None)
+            
+            if groups:
+                risk_counts = Counter()
+                scored = score_sum = 0
+                for group in groups:
+                    risk_counts[group["_id"]] += group["count"]
+                    scored += group["scored"]
+                    score_sum += group["score_sum"]
+                analytics = {
+                    "total_analyses": risk_counts.total(),
+                    "avg_risk_score": round(score_sum / scored, 3) if scored else 0.0,
+                    "risk_distribution": {level: risk_counts[level] for level in ("high", "medium", "low")}
                 }
+                self._analytics_cache = (time.monotonic(), copy.deepcopy(analytics))
+                return analytics
             
             return self.get_default_analytics()
             
@@ -203,20 +244,21 @@ class DatabaseManager:
             logger.error(f"Failed to get analytics: {e}")
             return self.get_default_analytics()
     
-    async def update_daily_analytics(self, analysis_data: dict):
+    async def update_daily_analytics(self, analysis_data: dict, now: Optional[datetime] = None):
         """Update daily analytics counters"""
+        self._analytics_cache = None
         try:
-            today = datetime.utcnow().date()
+            now = now or datetime.utcnow()
             
-            await self.database.analytics.update_one(
-                {"date": today},
+            await self.analytics_unack.update_one(
+                {"date": _utc_today()},
                 {
                     "$inc": {
                         "total_analyses": 1,
                         f"risk_levels.{analysis_data['risk_level']}": 1,
                         f"platforms.{analysis_data['platform']}": 1
                     },
-                    "$setOnInsert": {"created_at": datetime.utcnow()}
+                    "$setOnInsert": {"created_at": now}
                 },
                 upsert=True
             )
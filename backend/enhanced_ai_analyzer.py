@@ -1,16 +1,52 @@
 import asyncio
-import json
+import hashlib
+import orjson
 import time
 import os
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
-from groq import Groq
+from groq import AsyncGroq
 import aiohttp
+import httpx
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Every provider call is bounded: the SDK client gives up on a slow socket and
+# retries transient errors a couple of times, and the whole call is capped so a
+# hung provider cannot stall the ensemble
+PROVIDER_CLIENT_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+PROVIDER_MAX_RETRIES = 2
+PROVIDER_CALL_TIMEOUT = 15
+
+# One pooled HTTP client shared by all provider SDKs, so keep-alive connections
+# and TLS sessions are reused across analyses instead of one pool per SDK
+_provider_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    timeout=PROVIDER_CLIENT_TIMEOUT
+)
+
+async def aclose():
+    """Close the shared provider HTTP client (call on application shutdown)"""
+    if not _provider_http_client.is_closed:
+        await _provider_http_client.aclose()
+
+# Stop waiting on slower providers once this many confident verdicts agree
+ENSEMBLE_QUORUM = 2
+QUORUM_MIN_CONFIDENCE = 85
+QUORUM_MAX_SPREAD = 10  # threat_score points
+
+# Ensemble results kept per (url, content); least recently used entries go first
+MAX_ENSEMBLE_CACHE_SIZE = 1024
+
+def _ensemble_cache_key(url: str, content: str) -> str:
+    """Digest of the URL and the full content, so different pages of equal length don't collide"""
+    digest = hashlib.blake2b(url.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(content.encode())
+    return digest.hexdigest()
+
 class EnhancedAIAnalyzer:
     """
     Multi-AI Ensemble Analyzer using Groq, Anthropic, and OpenAI
@@ -25,7 +61,12 @@ class EnhancedAIAnalyzer:
         groq_key = os.getenv("GROQ_API_KEY")
         if groq_key:
             self.providers["groq"] = {
-                "client": Groq(api_key=groq_key),
+                "client": AsyncGroq(
+                    api_key=groq_key,
+                    timeout=PROVIDER_CLIENT_TIMEOUT,
+                    max_retries=PROVIDER_MAX_RETRIES,
+                    http_client=_provider_http_client
+                ),
                 "model": "mixtral-8x7b-32768",
                 "weight": 0.5,  # Primary provider
                 "cost_per_1k": 0.0  # Free tier
@@ -37,7 +78,12 @@ class EnhancedAIAnalyzer:
             try:
                 import anthropic
                 self.providers["anthropic"] = {
-                    "client": anthropic.Anthropic(api_key=anthropic_key),
+                    "client": anthropic.AsyncAnthropic(
+                        api_key=anthropic_key,
+                        timeout=PROVIDER_CLIENT_TIMEOUT,
+                        max_retries=PROVIDER_MAX_RETRIES,
+                        http_client=_provider_http_client
+                    ),
                     "model": "claude-3-haiku-20240307",
                     "weight": 0.3,
                     "cost_per_1k": 0.25  # $0.25/$1K tokens
@@ -51,7 +97,12 @@ class EnhancedAIAnalyzer:
             try:
                 import openai
                 self.providers["openai"] = {
-                    "client": openai.OpenAI(api_key=openai_key),
+                    "client": openai.AsyncOpenAI(
+                        api_key=openai_key,
+                        timeout=PROVIDER_CLIENT_TIMEOUT,
+                        max_retries=PROVIDER_MAX_RETRIES,
+                        http_client=_provider_http_client
+                    ),
                     "model": "gpt-3.5-turbo",
                     "weight": 0.2,
                     "cost_per_1k": 1.0  # $1.0/$1K tokens
@@ -73,12 +124,11 @@ class EnhancedAIAnalyzer:
         start_time = time.time()
         
         # Check cache first
-        cache_key = f"{url}:{len(content)}"
-        if cache_key in self.analysis_cache:
-            cached = self.analysis_cache[cache_key]
-            if time.time() - cached["timestamp"] < self.cache_ttl:
-                logger.info("🔄 Using cached AI analysis")
-                return cached["result"]
+        cache_key = _ensemble_cache_key(url, content)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            logger.info("🔄 Using cached AI analysis")
+            return cached
         
         # Prepare analysis tasks
         tasks = []
@@ -96,9 +146,9 @@ class EnhancedAIAnalyzer:
             logger.error("❌ No AI providers available")
             return self._fallback_analysis()
         
-        # Run all analyses in parallel
+        # Run all analyses in parallel, stopping early once a quorum agrees
         logger.info(f"🚀 Running {len(tasks)} AI analyses in parallel")
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await self._gather_until_quorum(tasks)
         
         # Ensemble decision making
         final_result = self._ensemble_decision(results)
@@ -112,14 +162,59 @@ class EnhancedAIAnalyzer:
         }
         
         # Cache result
-        self.analysis_cache[cache_key] = {
-            "result": final_result,
-            "timestamp": time.time()
-        }
+        self._cache_result(cache_key, final_result)
         
         logger.info(f"✅ Multi-AI analysis completed in {analysis_time}ms")
         return final_result
     
+    async def _gather_until_quorum(self, coros: List) -> List:
+        """Collect provider results as they finish; cancel the rest once a quorum agrees"""
+        tasks = [asyncio.create_task(coro) for coro in coros]
+        results = []
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                try:
+                    results.append(await next_result)
+                except Exception as e:
+                    results.append(e)
+                if len(results) < len(tasks) and self._quorum_reached(results):
+                    logger.info(f"⚡ Provider quorum reached with {len(results)}/{len(tasks)} results")
+                    break
+        finally:
+            # Covers the early exit and errors/cancellation of the caller alike;
+            # wait for the cancelled calls so their HTTP requests are torn down
+            # here and no task is left pending or with an unretrieved exception
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return results
+    
+    def _quorum_reached(self, results: List) -> bool:
+        """True when enough confident provider verdicts agree on the threat score"""
+        scores = [
+            r.get("threat_score", 50) for r in results
+            if isinstance(r, dict) and "error" not in r and r.get("confidence", 0) >= QUORUM_MIN_CONFIDENCE
+        ]
+        return len(scores) >= ENSEMBLE_QUORUM and max(scores) - min(scores) < QUORUM_MAX_SPREAD
+    
+    def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result, moving it to the most recently used end"""
+        cached = self.analysis_cache.pop(cache_key, None)
+        if cached is None or time.time() - cached["timestamp"] >= self.cache_ttl:
+            return None
+        self.analysis_cache[cache_key] = cached
+        return cached["result"]
+    
+    def _cache_result(self, cache_key: str, result: Dict[str, Any]):
+        """Cache a result, evicting the least recently used entry when full"""
+        if len(self.analysis_cache) >= MAX_ENSEMBLE_CACHE_SIZE:
+            del self.analysis_cache[next(iter(self.analysis_cache))]
+        self.analysis_cache[cache_key] = {
+            "result": result,
+            "timestamp": time.time()
+        }
+    
     async def _groq_analysis(self, url: str, content: str) -> Dict:
         """Groq: Fast, efficient analysis"""
         try:
@@ -142,17 +237,18 @@ Analyze for security threats. Return ONLY valid JSON:
 
 Be accurate and specific."""
 
-            response = await client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a cybersecurity expert. Respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=provider_info["model"],
-                temperature=0.1,
-                max_tokens=400
-            )
+            async with asyncio.timeout(PROVIDER_CALL_TIMEOUT):
+                response = await client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": "You are a cybersecurity expert. Respond with valid JSON only."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    model=provider_info["model"],
+                    temperature=0.1,
+                    max_tokens=400
+                )
             
-            result = json.loads(response.choices.message.content.strip())
+            result = orjson.loads(response.choices[0].message.content)
             result["provider"] = "groq"
             result["response_time_ms"] = 0  # Will be calculated
             
@@ -185,17 +281,18 @@ Respond with JSON only:
   "content_quality": "high|medium|low|suspicious"
 }}"""
 
-            message = await client.messages.create(
-                model=provider_info["model"],
-                max_tokens=500,
-                temperature=0.1,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            async with asyncio.timeout(PROVIDER_CALL_TIMEOUT):
+                message = await client.messages.create(
+                    model=provider_info["model"],
+                    max_tokens=500,
+                    temperature=0.1,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
             
-            result = json.loads(message.content.text.strip())
+            result = orjson.loads(message.content[0].text)
             result["provider"] = "anthropic"
             
             return result
@@ -210,11 +307,12 @@ Respond with JSON only:
             provider_info = self.providers["openai"]
             client = provider_info["client"]
             
-            response = await client.chat.completions.create(
-                model=provider_info["model"],
-                messages=[
-                    {"role": "system", "content": "Cybersecurity expert. Return valid JSON only."},
-                    {"role": "user", "content": f"""Security scan: {url}
+            async with asyncio.timeout(PROVIDER_CALL_TIMEOUT):
+                response = await client.chat.completions.create(
+                    model=provider_info["model"],
+                    messages=[
+                        {"role": "system", "content": "Cybersecurity expert. Return valid JSON only."},
+                        {"role": "user", "content": f"""Security scan: {url}
                     
 Content: {content[:800]}
 
@@ -226,12 +324,12 @@ JSON response:
   "category": "string",
   "pattern_matches": ["pattern1", "pattern2"]
 }}"""}
-                ],
-                temperature=0.1,
-                max_tokens=400
-            )
+                    ],
+                    temperature=0.1,
+                    max_tokens=400
+                )
             
-            result = json.loads(response.choices.message.content.strip())
+            result = orjson.loads(response.choices[0].message.content)
             result["provider"] = "openai"
             
             return result
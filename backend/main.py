@@ -2,10 +2,14 @@ import os
 import logging
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timedelta
 import asyncio
+import bisect
+import hashlib
+import threading
+import time
 import json
 
 # Import enhanced analyzers with fallback handling
@@ -17,10 +21,117 @@ except ImportError as e:
     AdvancedAIAnalyzer = None
     AI_AVAILABLE = False
 
+try:
+    from enhanced_ai_analyzer import aclose as close_enhanced_ai
+except ImportError as e:
+    print(f"⚠️ Enhanced AI Analyzer import failed: {e}")
+    close_enhanced_ai = None
+
+try:
+    from config import log_configuration_summary
+except ImportError as e:
+    print(f"⚠️ Config import failed: {e}")
+    log_configuration_summary = None
+
+# Optional multi-pattern matcher for the content risk scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Phrases that raise the basic content risk score (matched case-insensitively)
+RISK_INDICATORS = (
+    "urgent", "click here", "limited time", "act now",
+    "free money", "guaranteed", "risk-free", "no questions asked",
+    "congratulations", "you've won", "claim now", "verify account"
+)
+
+def _build_risk_automaton():
+    """Build a single automaton matching every risk indicator in one pass"""
+    automaton = ahocorasick.Automaton()
+    for indicator in RISK_INDICATORS:
+        automaton.add_word(indicator, indicator)
+    automaton.make_automaton()
+    return automaton
+
+RISK_AUTOMATON = _build_risk_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Basic content risk ladder: percentages above each threshold move up one label
+RISK_LEVEL_THRESHOLDS = (30, 60)
+RISK_LEVEL_LABELS = ("Low", "Medium", "High")
+
+# Largest number of items accepted by /api/analyze-batch
+MAX_ANALYZE_BATCH = 10
+
+# Content size (chars) above which the risk scan runs in a worker thread;
+# below it the thread hand-off costs more than the scan itself
+OFFLOAD_ANALYSIS_CHARS = 16_384
+
+# Content-derived analysis figures keyed by content digest, least recently used first.
+# Large posts are profiled in worker threads, so every cache access takes the lock.
+MAX_CONTENT_PROFILE_CACHE = 10_000
+_content_profile_cache: dict = {}
+_content_profile_lock = threading.Lock()
+
+def count_risk_indicators(content_lower: str) -> int:
+    """Number of distinct risk indicators present in already-lowercased content"""
+    if RISK_AUTOMATON is not None:
+        return len({indicator for _, indicator in RISK_AUTOMATON.iter(content_lower)})
+    return sum(1 for indicator in RISK_INDICATORS if indicator in content_lower)
+
+def content_risk_profile(content: str) -> tuple:
+    """(word_count, char_count, risk_indicators_found) for content, reused for repeated posts"""
+    key = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    with _content_profile_lock:
+        profile = _content_profile_cache.pop(key, None)
+        if profile is not None:
+            _content_profile_cache[key] = profile
+            return profile
+    
+    # The scan itself runs outside the lock
+    profile = (len(content.split()), len(content), count_risk_indicators(content.lower()))
+    with _content_profile_lock:
+        _content_profile_cache.pop(key, None)
+        if len(_content_profile_cache) >= MAX_CONTENT_PROFILE_CACHE:
+            del _content_profile_cache[next(iter(_content_profile_cache))]
+        _content_profile_cache[key] = profile
+    return profile
+
+def basic_content_analysis(content: str, platform: str, now: datetime) -> dict:
+    """Pattern-based risk assessment shared by the single and batch analyze endpoints"""
+    # Simple risk assessment based on content characteristics
+    word_count, char_count, risk_score = content_risk_profile(content)
+    risk_percentage = min(risk_score * 15, 85)  # Cap at 85%
+    risk_level = RISK_LEVEL_LABELS[bisect.bisect_left(RISK_LEVEL_THRESHOLDS, risk_percentage)]
+    
+    return {
+        "content": content[:100] + "..." if len(content) > 100 else content,
+        "platform": platform,
+        "risk_score": risk_percentage,
+        "analysis": f"Content analysis completed. Risk level: {risk_level}",
+        "details": {
+            "word_count": word_count,
+            "char_count": char_count,
+            "risk_indicators_found": risk_score,
+            "assessment": "Basic content analysis using pattern matching"
+        },
+        "timestamp": now.isoformat(),
+        "version": "3.1.0",
+        "scan_type": "basic_content"
+    }
+
+async def run_content_analysis(content: str, platform: str, now: datetime) -> dict:
+    """Run basic_content_analysis, off the event loop when content is large"""
+    if len(content) < OFFLOAD_ANALYSIS_CHARS:
+        return basic_content_analysis(content, platform, now)
+    return await asyncio.to_thread(basic_content_analysis, content, platform, now)
+
 # Initialize FastAPI with comprehensive configuration
 app = FastAPI(
     title="ViralSafe Platform Enhanced API",
@@ -28,7 +139,8 @@ app = FastAPI(
     version="3.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Enhanced CORS Configuration
@@ -59,6 +171,9 @@ async def startup_event():
     
     logger.info("🚀 Starting ViralSafe Enhanced API v3.1.0")
     
+    if log_configuration_summary:
+        log_configuration_summary()
+    
     try:
         # MongoDB connection
         mongodb_uri = os.getenv("MONGODB_URI")
@@ -97,6 +212,14 @@ async def shutdown_event():
         mongo_client.close()
         logger.info("✅ MongoDB connection closed")
     
+    if AI_AVAILABLE:
+        await AdvancedAIAnalyzer.aclose()
+        logger.info("✅ AI analyzer HTTP session and Groq client closed")
+    
+    if close_enhanced_ai:
+        await close_enhanced_ai()
+        logger.info("✅ Provider HTTP client closed")
+    
     logger.info("👋 ViralSafe Enhanced API shutdown completed")
 
 # Enhanced Health Check Endpoint
@@ -199,42 +322,15 @@ async def analyze_content(request: dict):
         raise HTTPException(status_code=400, detail="Content parameter is required")
     
     try:
-        # Enhanced basic analysis
-        word_count = len(content.split())
-        char_count = len(content)
-        
-        # Simple risk assessment based on content characteristics
-        risk_indicators = [
-            "urgent", "click here", "limited time", "act now", 
-            "free money", "guaranteed", "risk-free", "no questions asked",
-            "congratulations", "you've won", "claim now", "verify account"
-        ]
-        
-        risk_score = sum(1 for indicator in risk_indicators if indicator.lower() in content.lower())
-        risk_percentage = min(risk_score * 15, 85)  # Cap at 85%
-        
-        result = {
-            "content": content[:100] + "..." if len(content) > 100 else content,
-            "platform": platform,
-            "risk_score": risk_percentage,
-            "analysis": f"Content analysis completed. Risk level: {'High' if risk_percentage > 60 else 'Medium' if risk_percentage > 30 else 'Low'}",
-            "details": {
-                "word_count": word_count,
-                "char_count": char_count,
-                "risk_indicators_found": risk_score,
-                "assessment": "Basic content analysis using pattern matching"
-            },
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "3.1.0",
-            "scan_type": "basic_content"
-        }
+        now = datetime.utcnow()
+        result = await run_content_analysis(content, platform, now)
         
         # Store in database if available
         if db:
             try:
                 await db.analyses.insert_one({
                     **result,
-                    "created_at": datetime.utcnow()
+                    "created_at": now
                 })
             except Exception as e:
                 logger.warning(f"⚠️ Failed to store analysis: {e}")
@@ -245,6 +341,39 @@ async def analyze_content(request: dict):
         logger.error(f"❌ Content analysis error: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+# Batch Content Analysis
+@app.post("/api/analyze-batch")
+async def analyze_content_batch(request: dict):
+    """Basic content analysis for several items in one request, results in request order"""
+    
+    items = request.get("items")
+    
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="Items parameter must be a non-empty list")
+    if len(items) > MAX_ANALYZE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ANALYZE_BATCH} items per batch")
+    if not all(isinstance(item, dict) and item.get("content") for item in items):
+        raise HTTPException(status_code=400, detail="Every item requires a content parameter")
+    
+    try:
+        now = datetime.utcnow()
+        results = list(await asyncio.gather(*(
+            run_content_analysis(item["content"], item.get("platform", "unknown"), now) for item in items
+        )))
+        
+        # Store the whole batch in one round trip
+        if db:
+            try:
+                await db.analyses.insert_many([{**result, "created_at": now} for result in results])
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to store batch analyses: {e}")
+        
+        return {"results": results, "count": len(results)}
+        
+    except Exception as e:
+        logger.error(f"❌ Batch content analysis error: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+
 # Advanced AI-Powered URL Analysis
 @app.post("/api/advanced-scan")
 async def advanced_scan(request: dict):
@@ -298,9 +427,7 @@ async def advanced_scan(request: dict):
             logger.info(f"🚀 Running AI analysis for {url}")
             
             analyzer = AdvancedAIAnalyzer()
-            result = await analyzer.analyze_url_advanced(url)
-            result["version"] = "3.1.0"
-            result["scan_type"] = "ai_enhanced"
+            result = (await analyzer.analyze_url_advanced(url)).as_dict()
         
         # Store in MongoDB if available
         if db:
@@ -421,28 +548,25 @@ async def get_analytics():
         
         if db:
             try:
-                # Basic statistics
-                total_analyses = await db.analyses.count_documents({})
-                total_advanced = await db.advanced_scans.count_documents({})
-                
                 # Time-based analytics
                 now = datetime.utcnow()
                 today = now.replace(hour=0, minute=0, second=0, microsecond=0)
                 week_ago = today - timedelta(days=7)
                 
-                today_analyses = await db.analyses.count_documents({
-                    "created_at": {"$gte": today}
-                })
-                today_advanced = await db.advanced_scans.count_documents({
-                    "timestamp": {"$gte": today}
-                })
-                
-                week_analyses = await db.analyses.count_documents({
-                    "created_at": {"$gte": week_ago}
-                })
-                week_advanced = await db.advanced_scans.count_documents({
-                    "timestamp": {"$gte": week_ago}
-                })
+                # All counts are issued together; the all-time totals come from
+                # collection metadata instead of scanning every document
+                (
+                    total_analyses, total_advanced,
+                    today_analyses, today_advanced,
+                    week_analyses, week_advanced
+                ) = await asyncio.gather(
+                    db.analyses.estimated_document_count(),
+                    db.advanced_scans.estimated_document_count(),
+                    db.analyses.count_documents({"created_at": {"$gte": today}}),
+                    db.advanced_scans.count_documents({"timestamp": {"$gte": today}}),
+                    db.analyses.count_documents({"created_at": {"$gte": week_ago}}),
+                    db.advanced_scans.count_documents({"timestamp": {"$gte": week_ago}})
+                )
                 
                 analytics.update({
                     "usage_statistics": {
@@ -509,6 +633,7 @@ async def service_info():
         "endpoints": {
             "health_check": "/health",
             "basic_content_analysis": "/api/analyze",
+            "batch_content_analysis": "/api/analyze-batch",
             "advanced_url_scan": "/api/advanced-scan",
             "system_status": "/api/system-status",
             "analytics_dashboard": "/api/analytics",
@@ -535,7 +660,7 @@ async def service_info():
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     """Custom 404 handler with helpful information"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Endpoint not found",
@@ -558,7 +683,7 @@ async def not_found_handler(request: Request, exc):
 async def internal_error_handler(request: Request, exc):
     """Custom 500 handler with logging"""
     logger.error(f"🚨 Internal server error on {request.url.path}: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -573,13 +698,13 @@ async def internal_error_handler(request: Request, exc):
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all requests for monitoring"""
-    start_time = datetime.utcnow()
+    start_ns = time.perf_counter_ns()
     
     # Process request
     response = await call_next(request)
     
     # Calculate response time
-    process_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+    process_time = (time.perf_counter_ns() - start_ns) / 1_000_000
     
     # Log request details
     logger.info(f"📝 {request.method} {request.url.path} - {response.status_code} - {process_time:.2f}ms")
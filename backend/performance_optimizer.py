@@ -1,6 +1,7 @@
 import asyncio
+import bisect
 import time
-import json
+import orjson
 import hashlib
 import logging
 from concurrent.futures import ThreadPoolExecutor
@@ -8,10 +9,61 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import aiohttp
 from enhanced_ai_analyzer import enhanced_ai
-from advanced_scanner import advanced_scanner
+from advanced_scanner import (
+    advanced_scanner, GRADE_THRESHOLDS, GRADE_LABELS, RISK_LEVEL_THRESHOLDS, RISK_LEVEL_LABELS
+)
+
+# Aho-Corasick automaton for the quick keyword scan; plain substring checks otherwise
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Suspicious phrases checked by the quick scan
+QUICK_SCAN_KEYWORDS = (
+    "download now", "click here", "free download", "virus detected",
+    "security alert", "update required", "congratulations", "you've won"
+)
+
+def _build_quick_scan_automaton():
+    """Build a single automaton matching every quick scan keyword in one pass"""
+    automaton = ahocorasick.Automaton()
+    for keyword in QUICK_SCAN_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+QUICK_SCAN_AUTOMATON = _build_quick_scan_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Score-based recommendation templates: final scores at or above each threshold move up one tier
+RECOMMENDATION_THRESHOLDS = (60, 75, 90)
+SCORE_RECOMMENDATIONS = (
+    (
+        "🚨 Critical security issues detected",
+        "❌ Immediate security remediation required",
+        "📢 Consider professional security assessment"
+    ),
+    (
+        "⚠️ Security improvements needed",
+        "🔒 Implement additional security measures",
+        "🔍 Conduct detailed security audit"
+    ),
+    (
+        "⚡ Good security foundation",
+        "🔧 Consider security header improvements",
+        "📉 Monitor for security updates"
+    ),
+    (
+        "✅ Excellent security posture detected",
+        "📈 Maintain current security practices",
+        "🔄 Schedule periodic security reviews"
+    )
+)
+
 class PerformanceOptimizer:
     """
     Ultra-fast performance optimizer with:
@@ -224,33 +276,29 @@ class PerformanceOptimizer:
     
     def _generate_cache_key(self, url: str, options: Dict) -> str:
         """Generate cache key from URL and options"""
-        key_data = f"{url}:{json.dumps(options, sort_keys=True)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        digest = hashlib.blake2b(url.encode(), digest_size=16)
+        digest.update(b":")
+        digest.update(orjson.dumps(options, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        return digest.hexdigest()
     
     def _get_cached_result(self, cache_key: str) -> Optional[Dict]:
-        """Get cached result if still valid"""
-        if cache_key not in self.scan_cache:
-            return None
+        """Get cached result if still valid, moving it to the most recently used end"""
+        cached = self.scan_cache.pop(cache_key, None)
         
-        cached = self.scan_cache[cache_key]
-        
-        # Check if cache is still valid
-        if time.time() - cached["timestamp"] > self.cache_ttl:
-            # Remove expired cache
-            del self.scan_cache[cache_key]
+        # Expired entries stay removed
+        if cached is None or time.time() - cached["timestamp"] > self.cache_ttl:
             return None
         
+        self.scan_cache[cache_key] = cached
         return cached["result"]
     
     def _cache_result(self, cache_key: str, result: Dict):
         """Cache scan result with timestamp"""
         
-        # Implement simple cache size management
+        # Bounded LRU: the dict keeps least recently used entries first
+        self.scan_cache.pop(cache_key, None)
         if len(self.scan_cache) >= self.max_cache_size:
-            # Remove oldest entries
-            sorted_cache = sorted(self.scan_cache.items(), key=lambda x: x[1]["timestamp"])
-            for old_key, _ in sorted_cache[:100]:  # Remove oldest 100 entries
-                del self.scan_cache[old_key]
+            del self.scan_cache[next(iter(self.scan_cache))]
         
         self.scan_cache[cache_key] = {
             "result": result,
@@ -423,34 +471,12 @@ class PerformanceOptimizer:
     def _generate_smart_recommendations(self, scan_results: Dict, composite_score: Dict) -> List[str]:
         """Generate intelligent security recommendations"""
         
-        recommendations = []
         final_score = composite_score["final_score"]
         
         # Score-based recommendations
-        if final_score >= 90:
-            recommendations.extend([
-                "✅ Excellent security posture detected",
-                "📈 Maintain current security practices",
-                "🔄 Schedule periodic security reviews"
-            ])
-        elif final_score >= 75:
-            recommendations.extend([
-                "⚡ Good security foundation",
-                "🔧 Consider security header improvements",
-                "📉 Monitor for security updates"
-            ])
-        elif final_score >= 60:
-            recommendations.extend([
-                "⚠️ Security improvements needed",
-                "🔒 Implement additional security measures",
-                "🔍 Conduct detailed security audit"
-            ])
-        else:
-            recommendations.extend([
-                "🚨 Critical security issues detected",
-                "❌ Immediate security remediation required",
-                "📢 Consider professional security assessment"
-            ])
+        recommendations = list(
+            SCORE_RECOMMENDATIONS[bisect.bisect_right(RECOMMENDATION_THRESHOLDS, final_score)]
+        )
         
         # Specific technical recommendations
         if "security_headers" in scan_results:
@@ -471,13 +497,11 @@ class PerformanceOptimizer:
     
     def _quick_keyword_scan(self, content: str) -> List[str]:
         """Quick scan for suspicious keywords"""
-        keywords = [
-            "download now", "click here", "free download", "virus detected",
-            "security alert", "update required", "congratulations", "you've won"
-        ]
-        
         content_lower = content.lower()
-        return [kw for kw in keywords if kw in content_lower]
+        if QUICK_SCAN_AUTOMATON is not None:
+            found = {keyword for _, keyword in QUICK_SCAN_AUTOMATON.iter(content_lower)}
+            return [kw for kw in QUICK_SCAN_KEYWORDS if kw in found]
+        return [kw for kw in QUICK_SCAN_KEYWORDS if kw in content_lower]
     
     def _calculate_trust_rating(self, score: int, confidence: int) -> str:
         """Calculate trust rating from score and confidence"""
@@ -498,22 +522,11 @@ class PerformanceOptimizer:
     
     def _get_risk_level(self, score: int) -> str:
         """Get risk level description"""
-        if score >= 90: return "very_low"
-        if score >= 75: return "low"
-        if score >= 60: return "medium"
-        if score >= 40: return "high"
-        return "critical"
+        return RISK_LEVEL_LABELS[bisect.bisect_right(RISK_LEVEL_THRESHOLDS, score)]
     
     def _get_security_grade(self, score: int) -> str:
         """Get security grade"""
-        if score >= 95: return "A+"
-        if score >= 90: return "A"
-        if score >= 85: return "A-"
-        if score >= 80: return "B+"
-        if score >= 75: return "B"
-        if score >= 70: return "B-"
-        if score >= 65: return "C+"
-        return "C" if score >= 60 else "D" if score >= 50 else "F"
+        return GRADE_LABELS[bisect.bisect_right(GRADE_THRESHOLDS, score)]
     
     def _get_quality_grade(self, quality: float) -> str:
         """Get scan quality grade"""
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Backend modules are imported top-level (e.g. `from config import settings`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
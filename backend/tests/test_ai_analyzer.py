@@ -0,0 +1,144 @@
+"""Regression tests for reading Groq completions in AdvancedAIAnalyzer"""
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from ai_analyzer import AdvancedAIAnalyzer
+
+VERDICT = {
+    "threat_level": 2,
+    "confidence": 90,
+    "insights": "Looks fine",
+    "recommendations": ["Keep monitoring"],
+    "categories": ["Web Content"],
+    "risk_factors": ["None found"]
+}
+
+class FakeStream:
+    """Async iterator of streamed completion chunks, like the Groq SDK returns"""
+
+    def __init__(self, deltas):
+        self._chunks = iter(
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+            for delta in deltas
+        )
+        self.response = SimpleNamespace(aclose=self._aclose)
+        self.closed = False
+
+    async def _aclose(self):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class FakeCompletions:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.result
+
+def make_analyzer(result):
+    """Analyzer wired to a fake Groq client returning `result` from create()"""
+    completions = FakeCompletions(result)
+    analyzer = AdvancedAIAnalyzer.__new__(AdvancedAIAnalyzer)
+    analyzer.groq_api_key = "test"
+    analyzer.groq_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    analyzer.model = "test-model"
+    analyzer.max_tokens = 100
+    return analyzer, completions
+
+@pytest.mark.asyncio
+async def test_batch_analysis_reads_first_choice():
+    body = orjson.dumps({"results": [VERDICT, {"threat_level": 7}]}).decode()
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=body))])
+    analyzer, completions = make_analyzer(response)
+
+    results = await analyzer._run_groq_batch_analysis([
+        ("https://example.com", {"status_code": 200, "content": "<html>"}),
+        ("https://example.org", {"status_code": 200, "content": "<html>"})
+    ])
+
+    assert results[0]["threat_level"] == 2
+    assert results[0]["insights"] == "Looks fine"
+    assert results[1]["threat_level"] == 7
+    assert completions.calls[0]["response_format"] == {"type": "json_object"}
+
+@pytest.mark.asyncio
+async def test_streamed_analysis_returns_model_verdict():
+    body = orjson.dumps(VERDICT).decode()
+    stream = FakeStream([body[:10], body[10:], ""])
+    analyzer, completions = make_analyzer(stream)
+
+    result = await analyzer._run_groq_analysis("https://example.com", {"status_code": 200, "content": "<html>"}, "example.com")
+
+    assert result["threat_level"] == 2
+    assert result["confidence"] == 90
+    assert result["insights"] == "Looks fine"
+    assert completions.calls[0]["response_format"] == {"type": "json_object"}
+    assert stream.closed
+
+class FakeResponse:
+    """Minimal aiohttp response: status, headers and a readable body"""
+
+    def __init__(self, url, status, body=b"", headers=None):
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+        self.charset = "utf-8"
+        self.content = SimpleNamespace(read=self._read)
+        self._body = body
+
+    async def _read(self, size):
+        return self._body[:size]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers, allow_redirects):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+@pytest.mark.asyncio
+async def test_partial_content_is_reported_as_ok(monkeypatch):
+    url = "https://example.com/"
+    session = FakeSession(FakeResponse(url, 206, b"<html>head", {"Content-Range": "bytes 0-9/5000"}))
+    monkeypatch.setattr("ai_analyzer._get_http_session", lambda: session)
+    analyzer, _ = make_analyzer(None)
+
+    content_data = await analyzer._fetch_once(url)
+
+    assert content_data["status_code"] == 200
+    assert content_data["content"] == "<html>head"
+    assert content_data["content_length"] == 5000
+
+@pytest.mark.asyncio
+async def test_rejected_range_is_refetched_without_it(monkeypatch):
+    url = "https://example.com/"
+    session = FakeSession(FakeResponse(url, 416, b"bad range"), FakeResponse(url, 404, b"not here"))
+    monkeypatch.setattr("ai_analyzer._get_http_session", lambda: session)
+    analyzer, _ = make_analyzer(None)
+
+    content_data = await analyzer._fetch_once(url)
+
+    assert "Range" in session.requests[0]
+    assert "Range" not in session.requests[1]
+    assert content_data["status_code"] == 404
+    assert content_data["content"] == "not here"
@@ -1,5 +1,6 @@
 import aiohttp
 import asyncio
+import bisect
 import json
 import re
 import logging
@@ -11,6 +12,84 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Counting patterns, compiled once and consumed with finditer so match lists
+# are never materialized just to take their length
+SPECIAL_CHAR_PATTERN = re.compile(r'[-_]')
+DIGIT_PATTERN = re.compile(r'\d')
+URL_ENCODED_PATTERN = re.compile(r'%[0-9a-fA-F]{2}')
+
+# Threat level bands: a score strictly above a threshold moves up one level
+THREAT_LEVEL_THRESHOLDS = (20, 40, 60, 80)
+THREAT_LEVEL_LABELS = ("minimal", "low", "medium", "high", "critical")
+
+def _compile_threat_patterns(threat_patterns: Dict[str, List[Dict]]):
+    """Compile the threat pattern database plus one alternation that gates it.
+
+    The patterns are only ever searched, so their leading/trailing ".*" are
+    dropped; that keeps the result and avoids quadratic backtracking.
+    """
+    compiled = tuple(
+        (category, re.compile(info["pattern"].removeprefix(".*").removesuffix(".*")), info["weight"], info["description"])
+        for category, patterns in threat_patterns.items()
+        for info in patterns
+    )
+    prefilter = re.compile("|".join(f"(?:{pattern.pattern})" for _, pattern, _, _ in compiled))
+    return prefilter, compiled
+
+# Known phishing domain shapes, compiled once
+PHISHING_DOMAIN_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r".*paypal.*\.tk$",
+    r".*amazon.*\.ml$",
+    r".*microsoft.*\.ga$",
+    r".*google.*login.*",
+    r".*facebook.*secure.*",
+    r".*apple.*verification.*"
+))
+
+# Comprehensive TLD threat database
+TLD_RISK_LEVELS = {
+    # High risk TLDs
+    'tk': {'risk': 90, 'reason': 'Free TLD commonly used for malicious activities'},
+    'ml': {'risk': 85, 'reason': 'Free Mali TLD with high abuse rates'},
+    'ga': {'risk': 85, 'reason': 'Free Gabon TLD frequently abused'},
+    'cf': {'risk': 80, 'reason': 'Central African Republic TLD with abuse issues'},
+    'pw': {'risk': 75, 'reason': 'Palau TLD with security concerns'},
+    'top': {'risk': 70, 'reason': 'Generic TLD with moderate abuse'},
+    
+    # Medium risk TLDs
+    'click': {'risk': 60, 'reason': 'Generic TLD used in suspicious campaigns'},
+    'download': {'risk': 65, 'reason': 'TLD commonly associated with malware'},
+    'stream': {'risk': 55, 'reason': 'Often used for piracy and malware'},
+    
+    # Low risk/Trusted TLDs
+    'gov': {'risk': 5, 'reason': 'Government domain - highly trusted'},
+    'edu': {'risk': 8, 'reason': 'Educational institution - trusted'},
+    'mil': {'risk': 5, 'reason': 'Military domain - highly trusted'},
+    'org': {'risk': 15, 'reason': 'Non-profit organization - generally trusted'},
+    'com': {'risk': 20, 'reason': 'Commercial domain - standard'},
+    'net': {'risk': 22, 'reason': 'Network domain - standard'}
+}
+UNKNOWN_TLD_RISK = {'risk': 40, 'reason': 'Unknown TLD'}
+
+SUSPICIOUS_PATHS = (
+    '/wp-admin/', '/administrator/', '/admin/', '/login/', '/signin/',
+    '/download.php', '/install.exe', '/update.exe', '/setup.exe'
+)
+SUSPICIOUS_PARAMS = ('exec', 'cmd', 'eval', 'base64', 'shell')
+
+# Most threat intelligence results kept in memory (least recently used evicted first)
+MAX_THREAT_CACHE_SIZE = 500
+
+# Result keys for the comprehensive check, in the order the checks are gathered
+THREAT_CHECK_NAMES = (
+    "urlhaus_check", "openphish_check", "domain_reputation",
+    "custom_patterns", "tld_analysis", "url_structure"
+)
+
+def count_matches(pattern, text: str) -> int:
+    """Number of non-overlapping matches of a compiled pattern"""
+    return sum(1 for _ in pattern.finditer(text))
+
 class ThreatIntelligence:
     """
     Real-time threat intelligence integration
@@ -29,6 +108,7 @@ class ThreatIntelligence:
         
         # Threat pattern database
         self.threat_patterns = self._load_threat_patterns()
+        self.threat_prefilter, self.compiled_threat_patterns = _compile_threat_patterns(self.threat_patterns)
         
         # Cache for threat intelligence data
         self.threat_cache = {}
@@ -42,7 +122,7 @@ class ThreatIntelligence:
         start_time = time.time()
         
         # Check cache first
-        cache_key = hashlib.md5(url.encode()).hexdigest()
+        cache_key = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
         cached_result = self._get_cached_threat_data(cache_key)
         if cached_result:
             logger.info("📄 Using cached threat intelligence data")
@@ -119,23 +199,14 @@ class ThreatIntelligence:
             domain = urlparse(url).netloc
             
             # Known phishing domain patterns
-            phishing_patterns = [
-                r".*paypal.*\.tk$",
-                r".*amazon.*\.ml$",
-                r".*microsoft.*\.ga$",
-                r".*google.*login.*",
-                r".*facebook.*secure.*",
-                r".*apple.*verification.*"
-            ]
-            
-            for pattern in phishing_patterns:
-                if re.match(pattern, domain, re.IGNORECASE):
+            for pattern in PHISHING_DOMAIN_PATTERNS:
+                if pattern.match(domain):
                     return {
                         "source": "openphish_patterns",
                         "threat_found": True,
                         "threat_type": "phishing",
                         "confidence": 88,
-                        "pattern_matched": pattern
+                        "pattern_matched": pattern.pattern
                     }
             
             return {
@@ -177,13 +248,13 @@ class ThreatIntelligence:
                 reputation_factors.append("Very short domain name")
             
             # Special character analysis
-            special_chars = len(re.findall(r'[-_]', domain))
+            special_chars = count_matches(SPECIAL_CHAR_PATTERN, domain)
             if special_chars > 3:
                 reputation_score -= 10 * (special_chars - 3)
                 reputation_factors.append(f"Multiple special characters: {special_chars}")
             
             # Number analysis
-            numbers = len(re.findall(r'\d', domain))
+            numbers = count_matches(DIGIT_PATTERN, domain)
             if numbers > 5:
                 reputation_score -= 5 * (numbers - 5)
                 reputation_factors.append(f"Excessive numbers in domain: {numbers}")
@@ -209,18 +280,14 @@ class ThreatIntelligence:
             threats_detected = []
             total_threat_score = 0
             
+            # The domain is part of the URL and no pattern is anchored, so
+            # searching the full URL also covers the domain
             full_url = url.lower()
-            domain = urlparse(url).netloc.lower()
             
-            # Check each threat pattern
-            for category, patterns in self.threat_patterns.items():
-                for pattern_info in patterns:
-                    pattern = pattern_info["pattern"]
-                    weight = pattern_info["weight"]
-                    description = pattern_info["description"]
-                    
-                    # Check both full URL and domain
-                    if re.search(pattern, full_url) or re.search(pattern, domain):
+            # One pass over the URL decides whether any pattern can match at all
+            if self.threat_prefilter.search(full_url):
+                for category, pattern, weight, description in self.compiled_threat_patterns:
+                    if pattern.search(full_url):
                         threats_detected.append({
                             "category": category,
                             "description": description,
@@ -246,31 +313,7 @@ class ThreatIntelligence:
             domain = urlparse(url).netloc.lower()
             tld = domain.split('.')[-1] if '.' in domain else ''
             
-            # Comprehensive TLD threat database
-            tld_risk_levels = {
-                # High risk TLDs
-                'tk': {'risk': 90, 'reason': 'Free TLD commonly used for malicious activities'},
-                'ml': {'risk': 85, 'reason': 'Free Mali TLD with high abuse rates'},
-                'ga': {'risk': 85, 'reason': 'Free Gabon TLD frequently abused'},
-                'cf': {'risk': 80, 'reason': 'Central African Republic TLD with abuse issues'},
-                'pw': {'risk': 75, 'reason': 'Palau TLD with security concerns'},
-                'top': {'risk': 70, 'reason': 'Generic TLD with moderate abuse'},
-                
-                # Medium risk TLDs
-                'click': {'risk': 60, 'reason': 'Generic TLD used in suspicious campaigns'},
-                'download': {'risk': 65, 'reason': 'TLD commonly associated with malware'},
-                'stream': {'risk': 55, 'reason': 'Often used for piracy and malware'},
-                
-                # Low risk/Trusted TLDs
-                'gov': {'risk': 5, 'reason': 'Government domain - highly trusted'},
-                'edu': {'risk': 8, 'reason': 'Educational institution - trusted'},
-                'mil': {'risk': 5, 'reason': 'Military domain - highly trusted'},
-                'org': {'risk': 15, 'reason': 'Non-profit organization - generally trusted'},
-                'com': {'risk': 20, 'reason': 'Commercial domain - standard'},
-                'net': {'risk': 22, 'reason': 'Network domain - standard'}
-            }
-            
-            tld_info = tld_risk_levels.get(tld, {'risk': 40, 'reason': 'Unknown TLD'})
+            tld_info = TLD_RISK_LEVELS.get(tld, UNKNOWN_TLD_RISK)
             
             return {
                 "source": "tld_analysis",
@@ -304,13 +347,9 @@ class ThreatIntelligence:
                 structure_issues.append("Excessive subdomain levels")
             
             # Path analysis
-            suspicious_paths = [
-                '/wp-admin/', '/administrator/', '/admin/', '/login/', '/signin/',
-                '/download.php', '/install.exe', '/update.exe', '/setup.exe'
-            ]
-            
-            for path in suspicious_paths:
-                if path in url.lower():
+            url_lower = url.lower()
+            for path in SUSPICIOUS_PATHS:
+                if path in url_lower:
                     threat_score += 10
                     structure_issues.append(f"Suspicious path: {path}")
             
@@ -322,15 +361,15 @@ class ThreatIntelligence:
                     structure_issues.append("Unusually long URL parameters")
                 
                 # Check for suspicious parameters
-                suspicious_params = ['exec', 'cmd', 'eval', 'base64', 'shell']
-                for param in suspicious_params:
-                    if param in params.lower():
+                params_lower = params.lower()
+                for param in SUSPICIOUS_PARAMS:
+                    if param in params_lower:
                         threat_score += 25
                         structure_issues.append(f"Suspicious parameter: {param}")
             
             # URL encoding analysis
             if '%' in url:
-                encoded_chars = len(re.findall(r'%[0-9a-fA-F]{2}', url))
+                encoded_chars = count_matches(URL_ENCODED_PATTERN, url)
                 if encoded_chars > 10:  # Excessive URL encoding
                     threat_score += 12
                     structure_issues.append(f"Excessive URL encoding: {encoded_chars} chars")
@@ -375,11 +414,6 @@ class ThreatIntelligence:
     def _compile_threat_intelligence(self, url: str, results: List) -> Dict[str, Any]:
         """Compile all threat intelligence results"""
         
-        check_names = [
-            "urlhaus_check", "openphish_check", "domain_reputation", 
-            "custom_patterns", "tld_analysis", "url_structure"
-        ]
-        
         compiled = {
             "url": url,
             "threat_intelligence_timestamp": datetime.utcnow().isoformat(),
@@ -391,8 +425,8 @@ class ThreatIntelligence:
         
         # Process each threat check result
         for i, result in enumerate(results):
-            if i < len(check_names):
-                check_name = check_names[i]
+            if i < len(THREAT_CHECK_NAMES):
+                check_name = THREAT_CHECK_NAMES[i]
                 
                 if isinstance(result, dict) and "error" not in result:
                     compiled[check_name] = result
@@ -440,28 +474,23 @@ class ThreatIntelligence:
         return compiled
     
     def _get_cached_threat_data(self, cache_key: str) -> Optional[Dict]:
-        """Get cached threat intelligence data"""
-        if cache_key not in self.threat_cache:
-            return None
-        
-        cached = self.threat_cache[cache_key]
+        """Get cached threat intelligence data, moving it to the most recently used end"""
+        cached = self.threat_cache.pop(cache_key, None)
         
-        # Check expiration
-        if time.time() - cached["timestamp"] > self.cache_ttl:
-            del self.threat_cache[cache_key]
+        # Expired entries stay removed
+        if cached is None or time.time() - cached["timestamp"] > self.cache_ttl:
             return None
         
+        self.threat_cache[cache_key] = cached
         return cached["data"]
     
     def _cache_threat_data(self, cache_key: str, data: Dict):
         """Cache threat intelligence data"""
         
-        # Simple cache size management
-        if len(self.threat_cache) > 500:  # Max 500 cached entries
-            # Remove oldest 100 entries
-            sorted_cache = sorted(self.threat_cache.items(), key=lambda x: x[1]["timestamp"])
-            for old_key, _ in sorted_cache[:100]:
-                del self.threat_cache[old_key]
+        # Bounded LRU: the dict keeps least recently used entries first
+        self.threat_cache.pop(cache_key, None)
+        if len(self.threat_cache) >= MAX_THREAT_CACHE_SIZE:
+            del self.threat_cache[next(iter(self.threat_cache))]
         
         self.threat_cache[cache_key] = {
             "data": data,
@@ -470,11 +499,7 @@ class ThreatIntelligence:
     
     def _calculate_threat_level(self, score: int) -> str:
         """Calculate threat level from score"""
-        if score > 80: return "critical"
-        if score > 60: return "high"
-        if score > 40: return "medium"
-        if score > 20: return "low"
-        return "minimal"
+        return THREAT_LEVEL_LABELS[bisect.bisect_left(THREAT_LEVEL_THRESHOLDS, score)]
     
     def _get_structure_assessment(self, score: int) -> str:
         """Get URL structure assessment"""
@@ -5,6 +5,7 @@ import time
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta
 import httpx
+import orjson
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -183,7 +184,7 @@ class VirusTotalAPI:
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 scan_id = result.get("data", {}).get("id")
                 
                 scan_success = True
@@ -236,7 +237,7 @@ class VirusTotalAPI:
             
             if response.status_code == 200:
                 scan_success = True
-                return self._parse_url_report(response.json())
+                return self._parse_url_report(orjson.loads(response.content))
             elif response.status_code == 404:
                 # URL not found, submit for scanning
                 logger.info(f"🔍 URL not found in VT database, submitting for scan: {url}")
@@ -280,7 +281,7 @@ class VirusTotalAPI:
             
             if response.status_code == 200:
                 scan_success = True
-                return self._parse_file_report(response.json())
+                return self._parse_file_report(orjson.loads(response.content))
             elif response.status_code == 404:
                 # Set scan_success = True because the API call worked, just no data
                 scan_success = True